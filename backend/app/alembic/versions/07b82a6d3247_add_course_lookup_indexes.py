@@ -0,0 +1,79 @@
+"""add_course_lookup_indexes
+
+Revision ID: 07b82a6d3247
+Revises: 9ddaca105b4c
+Create Date: 2026-10-18 13:05:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '07b82a6d3247'
+down_revision = '9ddaca105b4c'
+branch_labels = None
+depends_on = None
+
+
+# (索引名, 表名, 列)
+INDEXES = [
+    ('ix_coursestudent_student_id', 'coursestudent', ['student_id']),
+    ('ix_course_schedule_id', 'course', ['schedule_id']),
+    ('ix_course_status', 'course', ['status']),
+    ('ix_schedule_teacher_id', 'schedule', ['teacher_id']),
+    ('ix_teacher_subject_id', 'teacher', ['subject_id']),
+]
+
+
+def upgrade():
+    # 唯一约束之前先清理重复的课程-学生关联，每对只保留一行
+    op.execute(
+        """
+        DELETE FROM coursestudent a
+        USING coursestudent b
+        WHERE a.course_id = b.course_id
+          AND a.student_id = b.student_id
+          AND a.id > b.id
+        """
+    )
+
+    # CONCURRENTLY 不能在事务中执行，建索引期间不锁写入
+    with op.get_context().autocommit_block():
+        # (course_id, student_id) 唯一索引同时服务于按 course_id 的查询
+        op.create_index(
+            'uq_coursestudent_course_id_student_id',
+            'coursestudent',
+            ['course_id', 'student_id'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+    # 将唯一索引挂为约束，供 ON CONFLICT 使用
+    op.execute(
+        'ALTER TABLE coursestudent '
+        'ADD CONSTRAINT uq_coursestudent_course_id_student_id '
+        'UNIQUE USING INDEX uq_coursestudent_course_id_student_id'
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_coursestudent_course_id_student_id', 'coursestudent', type_='unique')
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,97 @@
+"""course_times_to_timestamptz
+
+Revision ID: a2f1f1da0a19
+Revises: 07b82a6d3247
+Create Date: 2026-10-18 13:31:40.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2f1f1da0a19'
+down_revision = '07b82a6d3247'
+branch_labels = None
+depends_on = None
+
+
+# 每批回填的行数，分批提交避免长事务
+BATCH_SIZE = 5000
+
+
+def _backfill(sql):
+    # 每批单独提交，直到没有待处理的行
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        while True:
+            result = conn.execute(sa.text(sql), {"tz": settings.TIMEZONE, "batch": BATCH_SIZE})
+            if result.rowcount == 0:
+                break
+
+
+def upgrade():
+    op.add_column('course', sa.Column('start_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('course', sa.Column('end_at', sa.DateTime(timezone=True), nullable=True))
+
+    # 原字符串格式为 "YYYY-MM-DD HH:MM"，按 settings.TIMEZONE 解释
+    _backfill(
+        """
+        UPDATE course
+        SET start_at = start_time::timestamp AT TIME ZONE :tz,
+            end_at = end_time::timestamp AT TIME ZONE :tz
+        WHERE id IN (SELECT id FROM course WHERE start_at IS NULL LIMIT :batch)
+        """
+    )
+
+    op.alter_column('course', 'start_at', nullable=False)
+    op.alter_column('course', 'end_at', nullable=False)
+    op.drop_column('course', 'start_time')
+    op.drop_column('course', 'end_time')
+    op.alter_column('course', 'start_at', new_column_name='start_time')
+    op.alter_column('course', 'end_at', new_column_name='end_time')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_course_start_time',
+            'course',
+            ['start_time'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_course_time_range',
+            'course',
+            [sa.text('tstzrange(start_time, end_time)')],
+            postgresql_using='gist',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_course_time_range', table_name='course', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_course_start_time', table_name='course', postgresql_concurrently=True, if_exists=True)
+
+    op.add_column('course', sa.Column('start_str', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('course', sa.Column('end_str', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    _backfill(
+        """
+        UPDATE course
+        SET start_str = to_char(start_time AT TIME ZONE :tz, 'YYYY-MM-DD HH24:MI'),
+            end_str = to_char(end_time AT TIME ZONE :tz, 'YYYY-MM-DD HH24:MI')
+        WHERE id IN (SELECT id FROM course WHERE start_str IS NULL LIMIT :batch)
+        """
+    )
+
+    op.alter_column('course', 'start_str', nullable=False)
+    op.alter_column('course', 'end_str', nullable=False)
+    op.drop_column('course', 'start_time')
+    op.drop_column('course', 'end_time')
+    op.alter_column('course', 'start_str', new_column_name='start_time')
+    op.alter_column('course', 'end_str', new_column_name='end_time')
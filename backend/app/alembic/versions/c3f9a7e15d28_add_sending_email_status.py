@@ -0,0 +1,26 @@
+"""add_sending_email_status
+
+Revision ID: c3f9a7e15d28
+Revises: b8d41f6e2c07
+Create Date: 2026-10-18 21:12:40.331905
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f9a7e15d28'
+down_revision = 'b8d41f6e2c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 新的枚举值不能在添加它的事务中使用，单独提交
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE emailstatus ADD VALUE IF NOT EXISTS 'SENDING'")
+
+
+def downgrade():
+    # Postgres 不支持删除枚举值；发送中的邮件退回待发送
+    op.execute("UPDATE emailoutbox SET status = 'PENDING' WHERE status = 'SENDING'")
@@ -0,0 +1,52 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: c65975d1b9db
+Revises: a2f1f1da0a19
+Create Date: 2026-10-18 14:02:27.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c65975d1b9db'
+down_revision = 'a2f1f1da0a19'
+branch_labels = None
+depends_on = None
+
+
+# (索引名, 表名, 列)，与列表游标分页的排序键一致
+INDEXES = [
+    ('ix_student_name_id', 'student', ['name', 'id']),
+    ('ix_teacher_name_id', 'teacher', ['name', 'id']),
+    ('ix_course_start_time_id', 'course', ['start_time', 'id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # (start_time, id) 索引已覆盖按开始时间的查询
+        op.drop_index('ix_course_start_time', table_name='course', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_course_start_time',
+            'course',
+            ['start_time'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,16 +1,23 @@
-from collections.abc import Generator
-from typing import Annotated
+import secrets
+import uuid
+from collections.abc import AsyncGenerator, Generator, Iterable, Sequence
+from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud
 from app.core import security
+from app.core.cache import TTLCache, primary_reads
 from app.core.config import settings
-from app.core.db import engine
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.core.replica import new_async_session, new_session
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -18,27 +25,70 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+# Requests with these methods may read from a replica
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    with new_session(read_only=request.method in READ_ONLY_METHODS) as session:
+        yield session
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with new_async_session(
+        read_only=request.method in READ_ONLY_METHODS
+    ) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+user_cache = TTLCache(
+    "user",
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def _get_user(session: Session, user_id: uuid.UUID) -> User | None:
+    """
+    Load a user from the per-worker cache, falling back to the database.
+
+    Cached users are rebuilt from a snapshot and attached to ``session``
+    without a query, so routes can modify and commit them as usual. Misses
+    are read from the primary: a lagging replica could otherwise put a row
+    back into the cache after its update already evicted it.
+    """
+    data = user_cache.get(user_id)
+    if data is None:
+        generation = user_cache.generation
+        with primary_reads(session):
+            user = session.get(User, user_id)
+        if user:
+            user_cache.set(user_id, user.model_dump(), generation)
+        return user
+    user = User(**data)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+        user_id = uuid.UUID(str(token_data.sub))
+    except (InvalidTokenError, ValidationError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    user = _get_user(session, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -55,3 +105,51 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def verify_metrics_token(request: Request) -> None:
+    """
+    Guard /metrics: only a scraper with METRICS_TOKEN may read it.
+    """
+    # An empty value (unset in docker-compose) counts as no token
+    if not settings.METRICS_TOKEN:
+        if settings.ENVIRONMENT == "local":
+            return
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def ensure_ids_exist(
+    session: Session,
+    model: type[SQLModel],
+    ids: Iterable[uuid.UUID],
+    message: str,
+) -> None:
+    """
+    Check a list of ids with one query and report every missing id in a single 404.
+    """
+    missing_ids = crud.get_missing_ids(session, model, ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": message, "missing_ids": [str(i) for i in missing_ids]},
+        )
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[Any], columns: Sequence[Any], limit: int
+) -> None:
+    """
+    Expose the cursor of the following page in the X-Next-Cursor header.
+    """
+    cursor = next_cursor(rows, columns, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
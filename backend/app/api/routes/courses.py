@@ -1,24 +1,50 @@
+from collections.abc import Iterable
+from datetime import datetime
 from typing import Any, List
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import engine
 from app import crud
-from app.models import CourseCreate, CourseUpdate, CourseWithDetails, Message
+from app.api.deps import ensure_ids_exist, get_async_db, get_db, set_next_cursor
+from app.models import CourseConflictPair, CourseCreate, CourseStatus, CourseStudentIds, CourseUpdate, CourseWithDetails, Message, Student
 
 router = APIRouter()
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+
+def ensure_no_conflicts(
+    session: Session,
+    start_time: datetime,
+    end_time: datetime,
+    teacher_ids: Iterable[uuid.UUID] = (),
+    student_ids: Iterable[uuid.UUID] = (),
+    exclude_course_id: uuid.UUID | None = None,
+) -> None:
+    """
+    检查教师或学生在该时间段是否已有课程，有冲突时返回 409 并列出全部冲突
+    """
+    conflicts = crud.find_course_conflicts(
+        session,
+        start_time,
+        end_time,
+        teacher_ids=teacher_ids,
+        student_ids=student_ids,
+        exclude_course_id=exclude_course_id,
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "课程时间冲突", "conflicts": jsonable_encoder(conflicts)},
+        )
 
 
 @router.post("/courses/", response_model=CourseWithDetails, tags=["course"])
 def create_course_api(
     course_in: CourseCreate,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db)
 ) -> Any:
     """
     创建新的课程安排
@@ -32,70 +58,96 @@ def create_course_api(
         )
     
     # 验证学生是否存在
-    if course_in.student_ids:
-        for student_id in course_in.student_ids:
-            student = crud.get_student(session, student_id)
-            if not student:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"学生ID {student_id} 不存在"
-                )
+    ensure_ids_exist(session, Student, course_in.student_ids, "学生不存在")
     
-    course = crud.create_course(session, course_in)
+    # 检查教师和学生的时间冲突
+    if course_in.status != CourseStatus.CANCELLED:
+        ensure_no_conflicts(
+            session,
+            course_in.start_time,
+            course_in.end_time,
+            teacher_ids=[schedule.teacher_id],
+            student_ids=course_in.student_ids,
+        )
     
     # 返回包含详细信息的课程
-    courses = crud.get_courses(session, skip=0, limit=1)
-    if courses:
-        return courses[0]
-    
-    return course
+    return crud.create_course(session, course_in)
 
 
 @router.get("/courses/", response_model=List[CourseWithDetails], tags=["course"])
-def list_courses(
+async def list_courses(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    session: Session = Depends(get_session)
+    start_from: datetime | None = Query(default=None, alias="from"),
+    start_to: datetime | None = Query(default=None, alias="to"),
+    teacher_id: uuid.UUID | None = None,
+    status: CourseStatus | None = None,
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
-    获取课程安排列表
+    获取课程安排列表，按开始时间排序
+    
+    传入上一页响应头 X-Next-Cursor 中的 cursor 可按游标翻页
+    
+    - **from**: 开始时间下限（包含，可选）
+    - **to**: 开始时间上限（不包含，可选）
+    - **teacher_id**: 教师ID筛选（可选）
+    - **status**: 课程状态筛选（可选）
     """
-    courses = crud.get_courses(session, skip=skip, limit=limit)
+    courses = await crud.get_courses_async(
+        session,
+        skip=skip,
+        limit=limit,
+        start_from=start_from,
+        start_to=start_to,
+        teacher_id=teacher_id,
+        status=status,
+        cursor=cursor,
+    )
+    set_next_cursor(response, courses, crud.COURSE_ORDER, limit)
     return courses
 
 
+@router.get("/courses/conflicts", response_model=List[CourseConflictPair], tags=["course"])
+def get_course_conflicts_api(
+    start_from: datetime = Query(alias="from"),
+    start_to: datetime = Query(alias="to"),
+    session: Session = Depends(get_db)
+) -> Any:
+    """
+    审计时间段内（如整个学期）开始的课程，列出教师或学生被重复安排的课程对
+    
+    - **from**: 开始时间下限（包含）
+    - **to**: 开始时间上限（不包含）
+    """
+    return crud.get_course_conflict_report(session, start_from, start_to)
+
+
 @router.get("/courses/{course_id}", response_model=CourseWithDetails, tags=["course"])
-def get_course_api(
+async def get_course_api(
     course_id: uuid.UUID,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     根据ID获取课程安排
     """
-    course = crud.get_course(session, course_id)
+    course = await crud.get_course_detail_async(session, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="课程安排不存在"
         )
     
-    # 获取包含详细信息的课程
-    courses = crud.get_courses(session, skip=0, limit=1000)
-    for course_detail in courses:
-        if course_detail["id"] == course_id:
-            return course_detail
-    
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="课程安排不存在"
-    )
+    return course
 
 
 @router.put("/courses/{course_id}", response_model=CourseWithDetails, tags=["course"])
 def update_course_api(
     course_id: uuid.UUID,
     course_in: CourseUpdate,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db)
 ) -> Any:
     """
     更新课程安排
@@ -118,13 +170,33 @@ def update_course_api(
     
     # 验证学生是否存在（如果更新学生列表）
     if course_in.student_ids is not None:
-        for student_id in course_in.student_ids:
-            student = crud.get_student(session, student_id)
-            if not student:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"学生ID {student_id} 不存在"
-                )
+        ensure_ids_exist(session, Student, course_in.student_ids, "学生不存在")
+    
+    # 验证更新后的时间段
+    start_time = course_in.start_time or course.start_time
+    end_time = course_in.end_time or course.end_time
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="结束时间必须晚于开始时间"
+        )
+    
+    # 时间、课表、学生或状态变化时检查冲突
+    scheduling_fields = {"schedule_id", "start_time", "end_time", "student_ids", "status"}
+    if course_in.model_fields_set & scheduling_fields and (course_in.status or course.status) != CourseStatus.CANCELLED:
+        if course_in.schedule_id is None:
+            schedule = crud.get_schedule(session, course.schedule_id)
+        student_ids = course_in.student_ids
+        if student_ids is None:
+            student_ids = crud.get_course_student_ids(session, course_id)
+        ensure_no_conflicts(
+            session,
+            start_time,
+            end_time,
+            teacher_ids=[schedule.teacher_id] if schedule else [],
+            student_ids=student_ids,
+            exclude_course_id=course_id,
+        )
     
     course = crud.update_course(session, course_id, course_in)
     if not course:
@@ -134,18 +206,13 @@ def update_course_api(
         )
     
     # 返回更新后的详细信息
-    courses = crud.get_courses(session, skip=0, limit=1000)
-    for course_detail in courses:
-        if course_detail["id"] == course_id:
-            return course_detail
-    
-    return course
+    return crud.get_course_detail(session, course_id)
 
 
 @router.delete("/courses/{course_id}", response_model=Message, tags=["course"])
 def delete_course_api(
     course_id: uuid.UUID,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db)
 ) -> Any:
     """
     删除课程安排
@@ -164,7 +231,78 @@ def delete_course_api(
             detail="删除课程安排失败"
         )
     
-    return {"message": "课程安排删除成功"} 
+    return {"message": "课程安排删除成功"}
+
+
+@router.post("/courses/{course_id}/students", response_model=CourseWithDetails, tags=["course"])
+def add_course_students_api(
+    course_id: uuid.UUID,
+    students_in: CourseStudentIds,
+    session: Session = Depends(get_db)
+) -> Any:
+    """
+    为课程批量添加学生，已在课程中的学生会被忽略
+    """
+    course = crud.get_course(session, course_id)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="课程安排不存在"
+        )
+    
+    ensure_ids_exist(session, Student, students_in.student_ids, "学生不存在")
+    if course.status != CourseStatus.CANCELLED:
+        ensure_no_conflicts(
+            session,
+            course.start_time,
+            course.end_time,
+            student_ids=students_in.student_ids,
+            exclude_course_id=course_id,
+        )
+    crud.add_course_students(session, course_id, students_in.student_ids)
+    return crud.get_course_detail(session, course_id)
 
 
- 
\ No newline at end of file
+@router.delete("/courses/{course_id}/students", response_model=CourseWithDetails, tags=["course"])
+def remove_course_students_api(
+    course_id: uuid.UUID,
+    student_ids: List[uuid.UUID] = Query(min_length=1),
+    session: Session = Depends(get_db)
+) -> Any:
+    """
+    从课程中批量移除学生，未参加该课程的学生会被忽略
+    """
+    course = crud.get_course(session, course_id)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="课程安排不存在"
+        )
+    
+    crud.remove_course_students(session, course_id, student_ids)
+    return crud.get_course_detail(session, course_id)
+
+
+@router.delete("/courses/{course_id}/students/{student_id}", response_model=CourseWithDetails, tags=["course"])
+def remove_course_student_api(
+    course_id: uuid.UUID,
+    student_id: uuid.UUID,
+    session: Session = Depends(get_db)
+) -> Any:
+    """
+    从课程中移除单个学生
+    """
+    course = crud.get_course(session, course_id)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="课程安排不存在"
+        )
+    
+    removed = crud.remove_course_students(session, course_id, [student_id])
+    if not removed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="该学生未参加此课程"
+        )
+    return crud.get_course_detail(session, course_id)
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -9,7 +9,9 @@ from app import crud
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
 from app.core import security
 from app.core.config import settings
+from app.core.invalidation import publish
 from app.core.security import get_password_hash
+from app.core.throttle import login_limiter
 from app.models import Message, NewPassword, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
@@ -22,18 +24,31 @@ router = APIRouter(tags=["login"])
 
 
 @router.post("/login/access-token")
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    request: Request,
+    session: SessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
+    # 经过代理时为转发的客户端地址（见 FORWARDED_ALLOW_IPS）
+    client_ip = request.client.host if request.client else "unknown"
+    # 在密码哈希之前先预占令牌，并发的暴力尝试最多只有一桶令牌数进入哈希
+    if not await login_limiter.acquire_async(form_data.username, client_ip):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(login_limiter.retry_after)},
+        )
+    user = await crud.authenticate_async(
         session=session, email=form_data.username, password=form_data.password
     )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    elif not user.is_active:
+    # 密码正确，归还预占的令牌，只有失败的尝试计入限流
+    await login_limiter.release_async(form_data.username, client_ip)
+    if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return Token(
@@ -94,6 +109,7 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     hashed_password = get_password_hash(password=body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
+    publish(session, "user", user.id)
     session.commit()
     return Message(message="Password updated successfully")
 
@@ -1,40 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
 from typing import List
 import uuid
 
-from app.core.db import engine
+from app.api.deps import get_db, set_next_cursor
 from app.models import Schedule, ScheduleCreate, ScheduleUpdate, ScheduleWithTeacher
-from app.crud import create_schedule, get_schedule, get_schedules, update_schedule, delete_schedule
+from app.crud import create_schedule, get_schedule, get_schedules, update_schedule, delete_schedule, SCHEDULE_ORDER
 
 router = APIRouter()
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 @router.post("/schedules/", response_model=Schedule, tags=["schedule"])
-def create_schedule_api(schedule: ScheduleCreate, session: Session = Depends(get_session)):
+def create_schedule_api(schedule: ScheduleCreate, session: Session = Depends(get_db)):
     return create_schedule(session, schedule)
 
 @router.get("/schedules/", response_model=List[ScheduleWithTeacher], tags=["schedule"])
-def list_schedules(skip: int = 0, limit: int = 100, session: Session = Depends(get_session)):
-    return get_schedules(session, skip=skip, limit=limit)
+def list_schedules(response: Response, skip: int = 0, limit: int = 100, cursor: str | None = None, session: Session = Depends(get_db)):
+    schedules = get_schedules(session, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, schedules, SCHEDULE_ORDER, limit)
+    return schedules
 
 @router.get("/schedules/{schedule_id}", response_model=Schedule, tags=["schedule"])
-def get_schedule_api(schedule_id: uuid.UUID, session: Session = Depends(get_session)):
+def get_schedule_api(schedule_id: uuid.UUID, session: Session = Depends(get_db)):
     schedule = get_schedule(session, schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     return schedule
 
 @router.put("/schedules/{schedule_id}", response_model=Schedule, tags=["schedule"])
-def update_schedule_api(schedule_id: uuid.UUID, schedule_in: ScheduleUpdate, session: Session = Depends(get_session)):
+def update_schedule_api(schedule_id: uuid.UUID, schedule_in: ScheduleUpdate, session: Session = Depends(get_db)):
     schedule = update_schedule(session, schedule_id, schedule_in)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     return schedule
 
 @router.delete("/schedules/{schedule_id}", response_model=bool, tags=["schedule"])
-def delete_schedule_api(schedule_id: uuid.UUID, session: Session = Depends(get_session)):
+def delete_schedule_api(schedule_id: uuid.UUID, session: Session = Depends(get_db)):
     return delete_schedule(session, schedule_id) 
\ No newline at end of file
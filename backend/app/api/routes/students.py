@@ -1,51 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 import uuid
 
-from app.core.db import engine
+from app.api.deps import get_async_db, get_db, set_next_cursor
 from app.models import Student, StudentCreate, StudentUpdate, CourseWithDetails
-from app.crud import create_student, get_student, get_students, update_student, delete_student, get_student_courses
+from app.crud import create_student, get_student_async, get_students_async, update_student, delete_student, get_student_courses_async, STUDENT_ORDER
 
 router = APIRouter()
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 @router.post("/students/", response_model=Student, tags=["student"])
-def create_student_api(student: StudentCreate, session: Session = Depends(get_session)):
+def create_student_api(student: StudentCreate, session: Session = Depends(get_db)):
     return create_student(session, student)
 
 @router.get("/students/", response_model=List[Student], tags=["student"])
-def list_students(skip: int = 0, limit: int = 100, session: Session = Depends(get_session)):
-    return get_students(session, skip=skip, limit=limit)
+async def list_students(response: Response, skip: int = 0, limit: int = 100, cursor: str | None = None, session: AsyncSession = Depends(get_async_db)):
+    students = await get_students_async(session, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, students, STUDENT_ORDER, limit)
+    return students
 
 @router.get("/students/{student_id}", response_model=Student, tags=["student"])
-def get_student_api(student_id: uuid.UUID, session: Session = Depends(get_session)):
-    student = get_student(session, student_id)
+async def get_student_api(student_id: uuid.UUID, session: AsyncSession = Depends(get_async_db)):
+    student = await get_student_async(session, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
 @router.put("/students/{student_id}", response_model=Student, tags=["student"])
-def update_student_api(student_id: uuid.UUID, student_in: StudentUpdate, session: Session = Depends(get_session)):
+def update_student_api(student_id: uuid.UUID, student_in: StudentUpdate, session: Session = Depends(get_db)):
     student = update_student(session, student_id, student_in)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
 @router.delete("/students/{student_id}", response_model=bool, tags=["student"])
-def delete_student_api(student_id: uuid.UUID, session: Session = Depends(get_session)):
+def delete_student_api(student_id: uuid.UUID, session: Session = Depends(get_db)):
     return delete_student(session, student_id)
 
 @router.get("/students/{student_id}/courses/", response_model=List[CourseWithDetails], tags=["student"])
-def get_student_courses_api(
+async def get_student_courses_api(
     student_id: uuid.UUID,
     status: str | None = None,
     skip: int = 0,
     limit: int = 100,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_db)
 ):
     """
     获取学生参加的课程列表，支持按课程状态筛选
@@ -56,13 +55,11 @@ def get_student_courses_api(
     - **limit**: 返回的最大记录数（分页用）
     """
     # 验证学生是否存在
-    student = get_student(session, student_id)
+    student = await get_student_async(session, student_id)
     if not student:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="学生不存在"
-        )
+        # 参数 status 遮蔽了 fastapi.status，这里直接写状态码
+        raise HTTPException(status_code=404, detail="学生不存在")
     
     # 获取学生课程列表
-    courses = get_student_courses(session, student_id, status, skip, limit)
+    courses = await get_student_courses_async(session, student_id, status, skip, limit)
     return courses 
\ No newline at end of file
@@ -1,40 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
 from typing import List
 import uuid
 
-from app.core.db import engine
+from app.api.deps import get_db, set_next_cursor
 from app.models import Subject, SubjectCreate, SubjectUpdate
-from app.crud import create_subject, get_subject, get_subjects, update_subject, delete_subject
+from app.crud import create_subject, get_subject, get_subjects, update_subject, delete_subject, SUBJECT_ORDER
 
 router = APIRouter()
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 @router.post("/subjects/", response_model=Subject, tags=["subject"])
-def create_subject_api(subject: SubjectCreate, session: Session = Depends(get_session)):
+def create_subject_api(subject: SubjectCreate, session: Session = Depends(get_db)):
     return create_subject(session, subject)
 
 @router.get("/subjects/", response_model=List[Subject], tags=["subject"])
-def list_subjects(skip: int = 0, limit: int = 100, session: Session = Depends(get_session)):
-    return get_subjects(session, skip=skip, limit=limit)
+def list_subjects(response: Response, skip: int = 0, limit: int = 100, cursor: str | None = None, session: Session = Depends(get_db)):
+    subjects = get_subjects(session, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, subjects, SUBJECT_ORDER, limit)
+    return subjects
 
 @router.get("/subjects/{subject_id}", response_model=Subject, tags=["subject"])
-def get_subject_api(subject_id: uuid.UUID, session: Session = Depends(get_session)):
+def get_subject_api(subject_id: uuid.UUID, session: Session = Depends(get_db)):
     subject = get_subject(session, subject_id)
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     return subject
 
 @router.put("/subjects/{subject_id}", response_model=Subject, tags=["subject"])
-def update_subject_api(subject_id: uuid.UUID, subject_in: SubjectUpdate, session: Session = Depends(get_session)):
+def update_subject_api(subject_id: uuid.UUID, subject_in: SubjectUpdate, session: Session = Depends(get_db)):
     subject = update_subject(session, subject_id, subject_in)
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     return subject
 
 @router.delete("/subjects/{subject_id}", response_model=bool, tags=["subject"])
-def delete_subject_api(subject_id: uuid.UUID, session: Session = Depends(get_session)):
+def delete_subject_api(subject_id: uuid.UUID, session: Session = Depends(get_db)):
     return delete_subject(session, subject_id) 
\ No newline at end of file
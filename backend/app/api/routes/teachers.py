@@ -1,40 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 import uuid
 
-from app.core.db import engine
+from app.api.deps import get_async_db, get_db, set_next_cursor
 from app.models import Teacher, TeacherCreate, TeacherUpdate, TeacherWithSubject
-from app.crud import create_teacher, get_teacher, get_teachers, update_teacher, delete_teacher
+from app.crud import create_teacher, get_teacher_async, get_teachers_async, update_teacher, delete_teacher, TEACHER_ORDER
 
 router = APIRouter()
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 @router.post("/teachers/", response_model=Teacher, tags=["teacher"])
-def create_teacher_api(teacher: TeacherCreate, session: Session = Depends(get_session)):
+def create_teacher_api(teacher: TeacherCreate, session: Session = Depends(get_db)):
     return create_teacher(session, teacher)
 
 @router.get("/teachers/", response_model=List[TeacherWithSubject], tags=["teacher"])
-def list_teachers(skip: int = 0, limit: int = 100, session: Session = Depends(get_session)):
-    return get_teachers(session, skip=skip, limit=limit)
+async def list_teachers(response: Response, skip: int = 0, limit: int = 100, cursor: str | None = None, session: AsyncSession = Depends(get_async_db)):
+    teachers = await get_teachers_async(session, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, teachers, TEACHER_ORDER, limit)
+    return teachers
 
 @router.get("/teachers/{teacher_id}", response_model=Teacher, tags=["teacher"])
-def get_teacher_api(teacher_id: uuid.UUID, session: Session = Depends(get_session)):
-    teacher = get_teacher(session, teacher_id)
+async def get_teacher_api(teacher_id: uuid.UUID, session: AsyncSession = Depends(get_async_db)):
+    teacher = await get_teacher_async(session, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return teacher
 
 @router.put("/teachers/{teacher_id}", response_model=Teacher, tags=["teacher"])
-def update_teacher_api(teacher_id: uuid.UUID, teacher_in: TeacherUpdate, session: Session = Depends(get_session)):
+def update_teacher_api(teacher_id: uuid.UUID, teacher_in: TeacherUpdate, session: Session = Depends(get_db)):
     teacher = update_teacher(session, teacher_id, teacher_in)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return teacher
 
 @router.delete("/teachers/{teacher_id}", response_model=bool, tags=["teacher"])
-def delete_teacher_api(teacher_id: uuid.UUID, session: Session = Depends(get_session)):
+def delete_teacher_api(teacher_id: uuid.UUID, session: Session = Depends(get_db)):
     return delete_teacher(session, teacher_id) 
\ No newline at end of file
@@ -11,6 +11,7 @@ from app.api.deps import (
     get_current_active_superuser,
 )
 from app.core.config import settings
+from app.core.invalidation import publish
 from app.core.security import get_password_hash, verify_password
 from app.models import (
     Item,
@@ -92,6 +93,7 @@ def update_user_me(
     user_data = user_in.model_dump(exclude_unset=True)
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
+    publish(session, "user", current_user.id)
     session.commit()
     session.refresh(current_user)
     return current_user
@@ -113,6 +115,7 @@ def update_password_me(
     hashed_password = get_password_hash(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
+    publish(session, "user", current_user.id)
     session.commit()
     return Message(message="Password updated successfully")
 
@@ -135,6 +138,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
     session.delete(current_user)
+    publish(session, "user", current_user.id)
     session.commit()
     return Message(message="User deleted successfully")
 
@@ -222,5 +226,6 @@ def delete_user(
     statement = delete(Item).where(col(Item.owner_id) == user_id)
     session.exec(statement)  # type: ignore
     session.delete(user)
+    publish(session, "user", user_id)
     session.commit()
     return Message(message="User deleted successfully")
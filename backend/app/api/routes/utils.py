@@ -1,8 +1,11 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.models import Message
+from app.core.slow_queries import slow_query_log
+from app.models import Message, SlowQueriesPublic, SlowQueryPublic
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -29,3 +32,44 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+def _slow_queries_public(groups: list[dict[str, Any]]) -> SlowQueriesPublic:
+    data = [
+        SlowQueryPublic(
+            sql=group["sql"],
+            params_shape=group["worst"].params_shape,
+            caller=group["worst"].caller,
+            count=group["count"],
+            max_ms=group["worst"].seconds * 1000,
+            total_ms=group["total_ms"],
+            last_seen=group["worst"].at,
+            plan=group["plan"],
+        )
+        for group in groups
+    ]
+    return SlowQueriesPublic(data=data, count=len(data))
+
+
+@router.get(
+    "/slow-queries/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=SlowQueriesPublic,
+)
+def read_slow_queries(limit: int = 10) -> Any:
+    """
+    Slowest recent statements of this worker, grouped by normalized SQL.
+    """
+    return _slow_queries_public(slow_query_log.top(limit))
+
+
+@router.post(
+    "/slow-queries/explain/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=SlowQueriesPublic,
+)
+def explain_slow_queries(limit: int = 5) -> Any:
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) for the slowest SELECTs and keep the plans.
+    """
+    return _slow_queries_public(slow_query_log.explain(limit))
@@ -0,0 +1,217 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, cast
+
+from sqlalchemy import orm
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.invalidation import publish, subscribe
+from app.models import CacheVersion
+
+
+def get_cache_version(session: Session, name: str) -> int:
+    version = session.exec(
+        select(CacheVersion.version).where(CacheVersion.name == name)
+    ).first()
+    return version or 0
+
+
+def bump_cache_version(session: Session, name: str) -> None:
+    """
+    Increment the shared version of a cached table inside the caller's transaction.
+
+    Other workers compare it on their next check and reload their copy.
+    """
+    statement = pg_insert(CacheVersion).values(name=name, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1},
+    )
+    session.execute(statement)
+
+
+# While set in session.info, RoutingSession sends reads to the primary too
+PRIMARY_READS_KEY = "primary_reads"
+
+
+@contextmanager
+def primary_reads(session: orm.Session) -> Iterator[None]:
+    """
+    Run the statements in this block on the primary, even in a session
+    routed to a read replica, without pinning the rest of the session there.
+    """
+    previous = session.info.get(PRIMARY_READS_KEY, False)
+    session.info[PRIMARY_READS_KEY] = True
+    try:
+        yield
+    finally:
+        session.info[PRIMARY_READS_KEY] = previous
+
+
+class ReferenceCache:
+    """
+    Process-local copy of a small, rarely changing lookup table.
+
+    Rows are kept as plain dicts keyed by id. Writers call ``mark_changed``,
+    which notifies every worker to drop its copy once the transaction
+    commits. As a fallback for missed notifications, the table's version in
+    ``cacheversion`` is also compared every REFERENCE_CACHE_CHECK_SECONDS.
+    Versions and rows are always read from the primary, so a lagging replica
+    can never put stale rows back into the cache after an invalidation.
+    """
+
+    def __init__(
+        self, name: str, loader: Callable[[Session], list[dict[str, Any]]]
+    ) -> None:
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._rows: dict[uuid.UUID, dict[str, Any]] | None = None
+        self._version: int | None = None
+        self._checked_at = 0.0
+        subscribe(name, lambda _item_id: self.invalidate())
+
+    def get_all(self, session: Session) -> dict[uuid.UUID, dict[str, Any]]:
+        rows = self._rows
+        now = time.monotonic()
+        if (
+            rows is not None
+            and now - self._checked_at < settings.REFERENCE_CACHE_CHECK_SECONDS
+        ):
+            return rows
+        with self._lock:
+            if (
+                self._rows is not None
+                and now - self._checked_at < settings.REFERENCE_CACHE_CHECK_SECONDS
+            ):
+                return self._rows
+            with primary_reads(session):
+                # Read the version before the rows so a concurrent write is picked up next time
+                version = get_cache_version(session, self.name)
+                if self._rows is None or version != self._version:
+                    self._rows = {row["id"]: row for row in self._loader(session)}
+                    self._version = version
+            self._checked_at = now
+            return self._rows
+
+    async def get_all_async(
+        self, session: AsyncSession
+    ) -> dict[uuid.UUID, dict[str, Any]]:
+        """
+        Async counterpart of ``get_all``.
+
+        The lock is not held across awaits (that would block the event loop
+        while another coroutine waits for the database); concurrent reloads
+        at worst load the same rows twice.
+        """
+        rows = self._rows
+        now = time.monotonic()
+        if (
+            rows is not None
+            and now - self._checked_at < settings.REFERENCE_CACHE_CHECK_SECONDS
+        ):
+            return rows
+
+        def load(
+            sync_session: orm.Session,
+        ) -> tuple[int, dict[uuid.UUID, dict[str, Any]]]:
+            # sqlmodel's AsyncSession runs a sqlmodel Session underneath
+            sync_session = cast(Session, sync_session)
+            with primary_reads(sync_session):
+                version = get_cache_version(sync_session, self.name)
+                if rows is None or version != self._version:
+                    loaded = self._loader(sync_session)
+                    return version, {row["id"]: row for row in loaded}
+            return version, rows
+
+        version, loaded = await session.run_sync(load)
+        self._rows, self._version = loaded, version
+        self._checked_at = now
+        return loaded
+
+    def get(self, session: Session, item_id: uuid.UUID | None) -> dict[str, Any] | None:
+        if item_id is None:
+            return None
+        return self.get_all(session).get(item_id)
+
+    def mark_changed(self, session: Session, item_id: uuid.UUID | None = None) -> None:
+        """
+        Record a write to the cached table; call before the session commits.
+        """
+        bump_cache_version(session, self.name)
+        publish(session, self.name, item_id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._rows = None
+            self._version = None
+
+
+# Every TTLCache, for metrics
+ttl_caches: list["TTLCache"] = []
+
+
+class TTLCache:
+    """
+    Bounded, least-recently-used cache whose entries expire after ``ttl`` seconds.
+
+    Entries are evicted in every worker when ``name`` is published on the
+    invalidation channel. ``set`` takes the ``generation`` read before the
+    value was loaded and drops the value if an eviction happened meanwhile,
+    so a concurrent write cannot leave a stale entry behind.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        subscribe(name, self.evict)
+        ttl_caches.append(self)
+
+    def get(self, key: Any) -> Any | None:
+        key = str(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[str(key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(str(key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, key: Any | None = None) -> None:
+        """
+        Drop one entry, or all of them when ``key`` is None.
+        """
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(key), None)
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -35,8 +35,27 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Threads per worker process that run password hashing and verification
+    PASSWORD_HASH_WORKERS: int = 2
+    # Scheme and cost for new password hashes; existing hashes using another
+    # scheme or cost are upgraded on the user's next successful login
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    # Token buckets limiting failed logins per username and per client IP.
+    # A full bucket refills over LOGIN_THROTTLE_REFILL_SECONDS; the database
+    # backend shares buckets between worker processes.
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: Literal["memory", "database"] = "memory"
+    LOGIN_ATTEMPTS_PER_USERNAME: int = 5
+    LOGIN_ATTEMPTS_PER_IP: int = 20
+    LOGIN_THROTTLE_REFILL_SECONDS: float = 60.0
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
+    # Timezone used for naive course times and for timestamps returned by the DB
+    TIMEZONE: str = "Asia/Shanghai"
 
     BACKEND_CORS_ORIGINS: Annotated[
         list[AnyUrl] | str, BeforeValidator(parse_cors)
@@ -57,6 +76,42 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
 
+    # Connection pools of each worker process: the sync engine gets
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections and the async engine
+    # DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW, so the primary may see
+    # workers * (both pools + 1 LISTEN connection); the defaults keep 4
+    # workers at 84, under Postgres' default max_connections of 100. Each
+    # replica gets the same two pools per worker.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_ASYNC_POOL_SIZE: int = 3
+    DB_ASYNC_MAX_OVERFLOW: int = 2
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    # Server-side limit per statement in milliseconds, 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Optional read replicas (comma separated DSNs). GET requests read from a
+    # replica whose lag is below REPLICA_MAX_LAG_SECONDS; everything else,
+    # and any read after a write in the same request, uses the primary.
+    POSTGRES_REPLICA_URIS: Annotated[
+        list[PostgresDsn] | str, BeforeValidator(parse_cors)
+    ] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # Warn when one request runs the same statement shape more than this many
+    # times; per-request query counts are sent as headers outside production
+    QUERY_REPEAT_WARNING_THRESHOLD: int = 10
+    # Statements slower than this are logged and kept (the last
+    # SLOW_QUERY_LOG_SIZE of them) for /utils/slow-queries/; 0 disables it
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    # /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; without a
+    # token it is only served in the local environment
+    METRICS_TOKEN: str | None = None
+    # The email queue depth is counted at most once per this many seconds
+    METRICS_EMAIL_QUEUE_DEPTH_TTL_SECONDS: float = 30.0
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -77,6 +132,18 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: EmailStr | None = None
+    SMTP_TIMEOUT: float = 10.0
+    # Close the persistent SMTP connection after this long without sending
+    SMTP_IDLE_SECONDS: float = 60.0
+    # Outgoing emails are stored in the emailoutbox table and sent in batches
+    # by a background thread in each worker
+    EMAIL_QUEUE_BATCH_SIZE: int = 20
+    EMAIL_QUEUE_POLL_SECONDS: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 30.0
+    # A claimed message not marked sent or failed within this long (worker
+    # died mid-batch) is claimed again
+    EMAIL_SEND_LEASE_SECONDS: float = 300.0
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -86,6 +153,16 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Postgres NOTIFY channel used to evict cache entries in every worker
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_ENABLED: bool = True
+    # Fallback check of cached reference tables (subjects, roles) in case a
+    # notification was missed; writes normally evict them immediately
+    REFERENCE_CACHE_CHECK_SECONDS: float = 300.0
+    # Authenticated users cached by get_current_user, evicted on every user write
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
@@ -1,10 +1,140 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a free connection.
+
+    Every checkout is also passed to ``checkout_listeners`` as
+    ``(pool, waited_seconds, timed_out)``, e.g. to feed Prometheus metrics.
+    """
+
+    checkout_listeners: list[
+        Callable[["InstrumentedQueuePool", float, bool], None]
+    ] = []
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            for listener in self.checkout_listeners:
+                listener(self, waited, timed_out)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _connect_options(read_only: bool = False) -> str:
+    options = f"-c timezone={settings.TIMEZONE}"
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options += f" -c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if read_only:
+        # Replica connections refuse writes even if routing sends one there
+        options += " -c default_transaction_read_only=on"
+    return options
+
+
+def _engine_options(read_only: bool = False, is_async: bool = False) -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_ASYNC_POOL_SIZE if is_async else settings.DB_POOL_SIZE,
+        "max_overflow": (
+            settings.DB_ASYNC_MAX_OVERFLOW if is_async else settings.DB_MAX_OVERFLOW
+        ),
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": {"options": _connect_options(read_only)},
+    }
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **_engine_options(),
+)
+
+
+# Async engine (psycopg async driver) for the hot read endpoints; its own,
+# smaller pool (DB_ASYNC_POOL_SIZE) counts against max_connections too
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **_engine_options(is_async=True),
+)
+
+
+# Read replicas, each with a sync and an async engine
+replica_engines = [
+    create_engine(
+        str(uri), poolclass=InstrumentedQueuePool, **_engine_options(read_only=True)
+    )
+    for uri in settings.POSTGRES_REPLICA_URIS
+]
+async_replica_engines = [
+    create_async_engine(
+        str(uri),
+        poolclass=InstrumentedAsyncQueuePool,
+        **_engine_options(read_only=True, is_async=True),
+    )
+    for uri in settings.POSTGRES_REPLICA_URIS
+]
+
+
+def get_pool_stats(bind: Any = engine) -> dict[str, float]:
+    """
+    Checkout wait and saturation figures of this worker's connection pool.
+
+    ``bind`` may be ``engine`` or ``async_engine``.
+    """
+    pool = bind.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {}
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,225 @@
+"""
+Durable outbound email queue.
+
+``enqueue_email`` stores a message in the ``emailoutbox`` table and returns
+right away. ``EmailWorker`` threads (one per app worker) claim a batch of due
+messages with ``FOR UPDATE SKIP LOCKED`` and commit the claim at once,
+marking them ``sending`` with a lease of EMAIL_SEND_LEASE_SECONDS, so no
+connection or row lock is held while talking to the SMTP server. Messages
+are then sent one at a time over one persistent SMTP connection, and each
+result is committed on its own. Failed messages are retried with exponential
+backoff up to EMAIL_MAX_ATTEMPTS times; messages whose lease expired (the
+worker died mid-batch) are claimed again.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+_wakeup = threading.Event()
+
+
+def enqueue_email(
+    session: Session, *, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    now = datetime.now(timezone.utc)
+    email = EmailOutbox(
+        email_to=email_to,
+        subject=subject,
+        html_content=html_content,
+        created_at=now,
+        next_attempt_at=now,
+    )
+    session.add(email)
+    session.commit()
+    # Let this worker's sender pick it up without waiting for the next poll
+    _wakeup.set()
+    return email
+
+
+def get_email_queue_depth(session: Session) -> int:
+    return session.exec(
+        select(func.count()).where(
+            col(EmailOutbox.status).in_([EmailStatus.PENDING, EmailStatus.SENDING])
+        )
+    ).one()
+
+
+def build_message(email: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = email.subject
+    message["From"] = formataddr(
+        (str(settings.EMAILS_FROM_NAME), str(settings.EMAILS_FROM_EMAIL))
+    )
+    message["To"] = email.email_to
+    message.set_content(email.html_content, subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """
+    Lazily opened SMTP connection reused across messages.
+
+    It is closed after SMTP_IDLE_SECONDS without use, and reopened once if
+    the server dropped it between sends.
+    """
+
+    def __init__(self) -> None:
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        assert settings.SMTP_HOST, "no provided configuration for email variables"
+        smtp: smtplib.SMTP
+        if settings.SMTP_SSL and not settings.SMTP_TLS:
+            smtp = smtplib.SMTP_SSL(
+                settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+            )
+        else:
+            smtp = smtplib.SMTP(
+                settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+            )
+            if settings.SMTP_TLS:
+                smtp.starttls()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        if (
+            self._smtp
+            and time.monotonic() - self._last_used > settings.SMTP_IDLE_SECONDS
+        ):
+            self.close()
+        reused = self._smtp is not None
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+class EmailWorker:
+    def __init__(self) -> None:
+        self.connection = SMTPConnection()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="email-worker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        _wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=settings.SMTP_TIMEOUT + 5)
+            self._thread = None
+        self.connection.close()
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(
+            seconds=settings.EMAIL_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        )
+
+    def _claim(self) -> list[EmailOutbox]:
+        now = datetime.now(timezone.utc)
+        with Session(engine, expire_on_commit=False) as session:
+            emails = session.exec(
+                select(EmailOutbox)
+                .where(
+                    col(EmailOutbox.status).in_(
+                        [EmailStatus.PENDING, EmailStatus.SENDING]
+                    ),
+                    # For SENDING rows next_attempt_at is the lease expiry
+                    col(EmailOutbox.next_attempt_at) <= now,
+                )
+                .order_by(col(EmailOutbox.next_attempt_at))
+                .limit(settings.EMAIL_QUEUE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            ).all()
+            lease = now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS)
+            for email in emails:
+                email.status = EmailStatus.SENDING
+                email.next_attempt_at = lease
+                session.add(email)
+            session.commit()
+            return list(emails)
+
+    def _record(self, email: EmailOutbox, error: Exception | None) -> None:
+        now = datetime.now(timezone.utc)
+        email.attempts += 1
+        if error is None:
+            email.status = EmailStatus.SENT
+            email.sent_at = now
+        else:
+            email.last_error = str(error)[:1000]
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = EmailStatus.FAILED
+                logger.error(
+                    "Giving up on email %s to %s: %s", email.id, email.email_to, error
+                )
+            else:
+                email.status = EmailStatus.PENDING
+                email.next_attempt_at = now + self._retry_delay(email.attempts)
+        with Session(engine) as session:
+            session.merge(email)
+            session.commit()
+
+    def drain_once(self) -> int:
+        """
+        Send one batch of due messages and return how many were processed.
+        """
+        emails = self._claim()
+        for email in emails:
+            try:
+                self.connection.send(build_message(email))
+            except Exception as e:
+                # Any failure only affects this message; the connection is
+                # reopened for the next one
+                self.connection.close()
+                self._record(email, e)
+            else:
+                self._record(email, None)
+        return len(emails)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            _wakeup.clear()
+            try:
+                processed = self.drain_once()
+            except Exception:
+                logger.exception("Email worker failed to drain the queue")
+                processed = 0
+            # A full batch means more may be due; otherwise wait for new mail
+            if processed < settings.EMAIL_QUEUE_BATCH_SIZE:
+                _wakeup.wait(settings.EMAIL_QUEUE_POLL_SECONDS)
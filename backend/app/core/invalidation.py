@@ -0,0 +1,142 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+CRUD writes call ``publish`` inside their transaction. Postgres delivers
+the NOTIFY only if the transaction commits, to every worker listening on
+the channel. Each worker runs an ``InvalidationListener`` thread that
+passes the notifications to the callbacks registered with ``subscribe``.
+Notifications published in this process are also dispatched locally right
+after commit, so the writing worker never serves its own stale entries.
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called with the changed entity id, or None when everything must be dropped
+Callback = Callable[[str | None], None]
+
+_subscribers: dict[str, list[Callback]] = defaultdict(list)
+_PENDING_KEY = "pending_invalidations"
+
+
+def subscribe(entity: str, callback: Callback) -> None:
+    _subscribers[entity].append(callback)
+
+
+def unsubscribe(entity: str, callback: Callback) -> None:
+    if callback in _subscribers.get(entity, []):
+        _subscribers[entity].remove(callback)
+
+
+def dispatch(entity: str, entity_id: str | None) -> None:
+    for callback in _subscribers.get(entity, []):
+        try:
+            callback(entity_id)
+        except Exception:
+            logger.exception("Cache invalidation callback failed for %s", entity)
+
+
+def dispatch_all() -> None:
+    for entity in list(_subscribers):
+        dispatch(entity, None)
+
+
+def publish(session: Session, entity: str, entity_id: Any = None) -> None:
+    """
+    Announce a write to ``entity`` (optionally a single row) to every worker.
+
+    Must be called before the session commits.
+    """
+    entity_id = None if entity_id is None else str(entity_id)
+    payload = json.dumps({"entity": entity, "id": entity_id})
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.CACHE_INVALIDATION_CHANNEL, "payload": payload},
+    )
+    session.info.setdefault(_PENDING_KEY, []).append((entity, entity_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session: Session) -> None:
+    for entity, entity_id in session.info.pop(_PENDING_KEY, []):
+        dispatch(entity, entity_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class InvalidationListener:
+    """
+    Background thread holding a dedicated LISTEN connection.
+
+    After a dropped connection it reconnects with backoff and drops every
+    subscribed cache, since notifications sent meanwhile were lost.
+    """
+
+    def __init__(self, channel: str = settings.CACHE_INVALIDATION_CHANNEL) -> None:
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _connect(self) -> psycopg.Connection[Any]:
+        return psycopg.connect(
+            host=settings.POSTGRES_SERVER,
+            port=settings.POSTGRES_PORT,
+            user=settings.POSTGRES_USER,
+            password=settings.POSTGRES_PASSWORD,
+            dbname=settings.POSTGRES_DB,
+            autocommit=True,
+        )
+
+    def _handle(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            dispatch(message["entity"], message.get("id"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation: %r", payload)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                    dispatch_all()
+                    backoff = 1.0
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._handle(notify.payload)
+            except psycopg.Error as e:
+                logger.warning("Cache invalidation listener disconnected: %s", e)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
@@ -0,0 +1,338 @@
+"""
+Prometheus metrics.
+
+``MetricsMiddleware`` counts requests, in-flight requests, latency and
+response size per route, labeled with the route's unique id (the
+``custom_generate_unique_id`` name, e.g. ``course-list_courses``).
+Connection pool and password hash queue gauges and TTL cache hit/miss
+counters are refreshed after every request, and every pool checkout is
+counted with its wait time as it happens. The email queue depth is counted
+in the database at scrape time, at most once per
+METRICS_EMAIL_QUEUE_DEPTH_TTL_SECONDS.
+
+``/metrics`` is guarded by ``verify_metrics_token``: scrapers send
+``Authorization: Bearer <METRICS_TOKEN>``.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before the workers start: each worker then writes its values to
+its own memory-mapped files and a scrape of any worker aggregates all of
+them. Without it, metrics cover the scraped process only.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
+from sqlmodel import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import ttl_caches
+from app.core.config import settings
+from app.core.db import (
+    InstrumentedQueuePool,
+    async_engine,
+    async_replica_engines,
+    engine,
+    get_pool_stats,
+    replica_engines,
+)
+from app.core.email_queue import get_email_queue_depth
+from app.core.replica import replica_monitor
+from app.core.security import password_hash_queue_depth
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections checked out",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Overflow connections open",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Connection checkouts, including timed out", ["pool"]
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that timed out waiting", ["pool"]
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a free connection",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+DB_POOL_WAIT_MAX = Gauge(
+    "db_pool_checkout_wait_max_seconds",
+    "Longest wait for a free connection",
+    ["pool"],
+    multiprocess_mode="max",
+)
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth",
+    "Password hash operations running or waiting for the hash pool",
+    multiprocess_mode="livesum",
+)
+CACHE_HITS = Counter("cache_hits_total", "TTL cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "TTL cache misses", ["cache"])
+CACHE_SIZE = Gauge(
+    "cache_entries", "TTL cache entries", ["cache"], multiprocess_mode="livesum"
+)
+
+_POOL_BINDS: list[tuple[str, Any]] = [
+    ("primary", engine),
+    ("primary_async", async_engine),
+    *((f"replica{i}", e) for i, e in enumerate(replica_engines)),
+    *((f"replica{i}_async", e) for i, e in enumerate(async_replica_engines)),
+]
+# bind -> checked out, overflow and max wait gauges, refreshed per request
+_POOLS = [
+    (
+        bind,
+        DB_POOL_CHECKED_OUT.labels(name),
+        DB_POOL_OVERFLOW.labels(name),
+        DB_POOL_WAIT_MAX.labels(name),
+    )
+    for name, bind in _POOL_BINDS
+]
+# id(pool) -> checkouts, timeouts and wait metrics, updated on every checkout
+_pool_children: dict[int, tuple[Any, Any, Any]] = {
+    id(bind.pool): (
+        DB_POOL_CHECKOUTS.labels(name),
+        DB_POOL_TIMEOUTS.labels(name),
+        DB_POOL_WAIT.labels(name),
+    )
+    for name, bind in _POOL_BINDS
+}
+
+
+def _observe_checkout(
+    pool: InstrumentedQueuePool, waited: float, timed_out: bool
+) -> None:
+    children = _pool_children.get(id(pool))
+    if children is None:
+        return
+    checkouts, timeouts, wait = children
+    checkouts.inc()
+    if timed_out:
+        timeouts.inc()
+    wait.observe(waited)
+
+
+InstrumentedQueuePool.checkout_listeners.append(_observe_checkout)
+
+# Labeled children, created once per label set; later requests only look them
+# up in a plain dict instead of going through labels()
+_children: dict[tuple[str, str, str], tuple[Any, Any, Any]] = {}
+
+
+_route_names: dict[int, str] = {}
+
+
+def _route_name(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    name = _route_names.get(id(route))
+    if name is None:
+        # scope["route"] may be the route of the included router, whose
+        # unique_id was not generated by the app's custom_generate_unique_id
+        router = getattr(scope.get("app"), "router", None)
+        generate = getattr(router, "generate_unique_id_function", None)
+        generate = getattr(generate, "value", generate)
+        if isinstance(route, APIRoute) and callable(generate):
+            name = generate(route)
+        else:
+            name = getattr(route, "name", None) or "unmatched"
+        _route_names[id(route)] = name
+    return name
+
+
+def _metrics_for(method: str, route: str, status: str) -> tuple[Any, Any, Any]:
+    key = (method, route, status)
+    children = _children.get(key)
+    if children is None:
+        children = (
+            REQUESTS.labels(method, route, status),
+            LATENCY.labels(method, route),
+            RESPONSE_SIZE.labels(method, route),
+        )
+        _children[key] = children
+    return children
+
+
+def update_pool_gauges() -> None:
+    for bind, checked_out, overflow, wait_max in _POOLS:
+        stats = get_pool_stats(bind)
+        if stats:
+            checked_out.set(stats["checked_out"])
+            overflow.set(stats["overflow"])
+            wait_max.set(stats["wait_seconds_max"])
+    PASSWORD_HASH_QUEUE.set(password_hash_queue_depth())
+
+
+# Cache name -> (hits, misses) already added to the counters
+_cache_reported: dict[str, tuple[int, int]] = {}
+_cache_lock = threading.Lock()
+
+
+def update_cache_metrics() -> None:
+    # Runs on the event loop and in the /metrics threadpool
+    with _cache_lock:
+        for cache in ttl_caches:
+            stats = cache.stats()
+            hits, misses = _cache_reported.get(cache.name, (0, 0))
+            if stats["hits"] > hits:
+                CACHE_HITS.labels(cache.name).inc(stats["hits"] - hits)
+            if stats["misses"] > misses:
+                CACHE_MISSES.labels(cache.name).inc(stats["misses"] - misses)
+            CACHE_SIZE.labels(cache.name).set(stats["size"])
+            _cache_reported[cache.name] = (stats["hits"], stats["misses"])
+
+
+class EmailQueueCollector:
+    """
+    Email queue depth, counted in the outbox table at most once per
+    METRICS_EMAIL_QUEUE_DEPTH_TTL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._depth: int | None = None
+        self._counted_at = 0.0
+
+    def depth(self) -> int | None:
+        with self._lock:
+            now = time.monotonic()
+            ttl = settings.METRICS_EMAIL_QUEUE_DEPTH_TTL_SECONDS
+            if self._depth is None or now - self._counted_at >= ttl:
+                # A failed count is not retried before the TTL either
+                self._counted_at = now
+                try:
+                    with Session(engine) as session:
+                        self._depth = get_email_queue_depth(session)
+                except Exception as e:
+                    logger.warning("Could not read email queue depth: %s", e)
+                    self._depth = None
+            return self._depth
+
+    def collect(self) -> Iterator[Metric]:
+        depth = self.depth()
+        if depth is not None:
+            yield GaugeMetricFamily(
+                "email_queue_depth", "Emails waiting to be sent", value=depth
+            )
+
+
+class ReplicaLagCollector:
+    """
+    Replay lag of each read replica as last measured by this worker's
+    ``replica_monitor``; NaN while a replica is unreachable.
+    """
+
+    def collect(self) -> Iterator[Metric]:
+        lag = GaugeMetricFamily(
+            "db_replica_lag_seconds", "Read replica replay lag", labels=["replica"]
+        )
+        for index, seconds in enumerate(replica_monitor.lag_seconds):
+            lag.add_metric(
+                [f"replica{index}"], float("nan") if seconds is None else seconds
+            )
+        yield lag
+
+
+email_queue_collector = EmailQueueCollector()
+replica_lag_collector = ReplicaLagCollector()
+
+
+def generate_metrics() -> bytes:
+    update_pool_gauges()
+    update_cache_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    else:
+        registry = REGISTRY
+    # Read at scrape time in this process, so kept out of the multiprocess files
+    scrape_registry = CollectorRegistry()
+    scrape_registry.register(email_queue_collector)
+    scrape_registry.register(replica_lag_collector)
+    return generate_latest(registry) + generate_latest(scrape_registry)
+
+
+def mark_worker_stopped() -> None:
+    # Drops this worker's live gauges (in-flight, pools) from the aggregate
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            requests, latency, response_size = _metrics_for(
+                scope["method"], _route_name(scope), status
+            )
+            requests.inc()
+            latency.observe(elapsed)
+            response_size.observe(size)
+            update_pool_gauges()
+            update_cache_metrics()
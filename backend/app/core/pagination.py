@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _python_type(column: Any) -> type:
+    try:
+        python_type: type = column.type.python_type
+    except NotImplementedError:
+        return str
+    # AutoString does not report a python type
+    return str if python_type is object else python_type
+
+
+def _row_value(row: Any, column: Any) -> Any:
+    if isinstance(row, dict):
+        return row[column.key]
+    return getattr(row, column.key)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    encoded = [
+        v.isoformat()
+        if isinstance(v, datetime)
+        else str(v)
+        if isinstance(v, uuid.UUID)
+        else v
+        for v in values
+    ]
+    raw = json.dumps(encoded, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursorError(cursor)
+        decoded = []
+        for column, value in zip(columns, values, strict=True):
+            python_type = _python_type(column)
+            # encode_cursor writes these as strings; e.g. uuid.UUID(2) would
+            # raise AttributeError instead of a ValueError
+            if python_type in (datetime, uuid.UUID) and not isinstance(value, str):
+                raise InvalidCursorError(cursor)
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        return tuple(decoded)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(cursor) from e
+
+
+def paginate(
+    statement: Select,  # type: ignore[type-arg]
+    columns: Sequence[Any],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> Select:  # type: ignore[type-arg]
+    """
+    Order a statement by a unique key and apply either keyset or offset pagination.
+
+    With a cursor the page starts right after the row the cursor was built
+    from, so an index on the key columns serves every page at the cost of
+    the first one; ``skip`` is ignored in that case.
+    """
+    statement = statement.order_by(*columns)
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        statement = statement.where(
+            tuple_(*columns)
+            > tuple_(
+                *(literal(v, c.type) for c, v in zip(columns, values, strict=True))
+            )
+        )
+    elif skip:
+        statement = statement.offset(skip)
+    return statement.limit(limit)
+
+
+def paginate_rows(
+    rows: Sequence[Any],
+    columns: Sequence[Any],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> list[Any]:
+    """
+    In-memory counterpart of ``paginate`` for rows that are already loaded.
+    """
+
+    def key(row: Any) -> tuple[Any, ...]:
+        return tuple(_row_value(row, c) for c in columns)
+
+    ordered = sorted(rows, key=key)
+    if cursor:
+        after = decode_cursor(cursor, columns)
+        ordered = [row for row in ordered if key(row) > after]
+    elif skip:
+        ordered = ordered[skip:]
+    return ordered[:limit]
+
+
+def next_cursor(rows: Sequence[Any], columns: Sequence[Any], limit: int) -> str | None:
+    """
+    Cursor for the page after ``rows``, or None when this was the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor([_row_value(rows[-1], c) for c in columns])
@@ -0,0 +1,155 @@
+"""
+Per-request SQL statement counting.
+
+Engine events (registered on the ``Engine`` class, so the primary, replica
+and async engines are all covered) add every statement to the
+``QueryStats`` of the current request. ``QueryStatsMiddleware`` creates one
+per HTTP request, logs a warning when one statement shape runs more than
+QUERY_REPEAT_WARNING_THRESHOLD times (the usual sign of an N+1 loop) and,
+outside production, reports the totals in ``X-Query-Count`` and
+``Server-Timing`` response headers. Tests can use those headers, or
+``count_queries()`` around direct CRUD calls, to assert a query budget.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|\b\d+\b|'(?:[^']|'')*'")
+_PARAM_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape: parameters and literals replaced by ``?``, IN lists
+    collapsed to a single ``?`` and whitespace squeezed.
+    """
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _PARAM_LIST_RE.sub("?", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[normalize_sql(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Count the statements run in this context, e.g. around a CRUD call in a test.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    _conn: Any,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    if context is not None and _current.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    _conn: Any,
+    _cursor: Any,
+    statement: str,
+    _parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    stats = _current.get()
+    start = getattr(context, "_query_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware, so the context variable set here is the one seen by
+    the endpoint, its dependencies and the threadpool they run in.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = True) -> None:
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                headers.append(SERVER_TIMING_HEADER, stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            threshold = settings.QUERY_REPEAT_WARNING_THRESHOLD
+            for shape, n in stats.repeated(threshold):
+                logger.warning(
+                    "%s %s ran the same statement %d times (possible N+1): %s",
+                    scope["method"],
+                    scope["path"],
+                    n,
+                    shape,
+                )
@@ -0,0 +1,155 @@
+"""
+Read-replica routing.
+
+Sessions for read-only requests are ``RoutingSession``s: plain SELECTs go
+to a replica, while flushes, DML and anything else (including
+``SELECT ... FOR UPDATE`` and ``pg_notify``) go to the primary. After the
+first statement sent to the primary, the session stays there for the rest
+of its life, so a request reads its own writes. Inside ``primary_reads()``
+(used when filling the caches) reads go to the primary without pinning the
+session there.
+
+``ReplicaMonitor`` polls each replica's replay lag. A replica lagging more
+than REPLICA_MAX_LAG_SECONDS, or unreachable, gets no new sessions until it
+catches up. Replica connections are opened read-only, so any statement
+misrouted to a replica fails instead of writing there. For tests, a replica
+DSN pointing at the primary database works as a SELECT-only stand-in.
+"""
+
+import logging
+import random
+import threading
+from typing import Any
+
+from sqlalchemy import Engine, text
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import PRIMARY_READS_KEY
+from app.core.config import settings
+from app.core.db import async_engine, async_replica_engines, engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+_PRIMARY_KEY = "use_primary"
+
+# Zero on a primary or a replica that has replayed everything it received
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class RoutingSession(Session):
+    def __init__(
+        self, *args: Any, replica: Engine | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        if self.info.get(PRIMARY_READS_KEY) and isinstance(clause, Select):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if (
+            self.replica is not None
+            and not self._flushing
+            and not self.info.get(_PRIMARY_KEY)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return self.replica
+        if clause is not None or self._flushing:
+            self.info[_PRIMARY_KEY] = True
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReplicaMonitor:
+    """
+    Background thread measuring replay lag of every replica.
+    """
+
+    def __init__(self) -> None:
+        self.lag_seconds: list[float | None] = [None] * len(replica_engines)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def healthy(self) -> list[int]:
+        return [
+            index
+            for index, lag in enumerate(self.lag_seconds)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        ]
+
+    def check(self) -> None:
+        for index, replica in enumerate(replica_engines):
+            try:
+                with replica.connect() as conn:
+                    self.lag_seconds[index] = float(
+                        conn.execute(REPLICA_LAG_QUERY).scalar_one()
+                    )
+            except Exception as e:
+                logger.warning("Replica %s unavailable: %s", replica.url.host, e)
+                self.lag_seconds[index] = None
+
+    def status(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "host": replica.url.host,
+                "lag_seconds": self.lag_seconds[index],
+                "healthy": index in self.healthy(),
+            }
+            for index, replica in enumerate(replica_engines)
+        ]
+
+    def start(self) -> None:
+        if not replica_engines:
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="replica-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.REPLICA_LAG_CHECK_SECONDS):
+            self.check()
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def _pick_replica() -> int | None:
+    healthy = replica_monitor.healthy()
+    return random.choice(healthy) if healthy else None
+
+
+def new_session(read_only: bool = False) -> Session:
+    index = _pick_replica() if read_only else None
+    if index is None:
+        return Session(engine)
+    return RoutingSession(engine, replica=replica_engines[index])
+
+
+def new_async_session(read_only: bool = False) -> AsyncSession:
+    index = _pick_replica() if read_only else None
+    if index is None:
+        return AsyncSession(async_engine, expire_on_commit=False)
+    return AsyncSession(
+        async_engine,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        replica=async_replica_engines[index].sync_engine,
+    )
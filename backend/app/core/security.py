@@ -1,12 +1,60 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Both schemes stay verifiable; hashes not matching the configured scheme
+# and cost are reported by needs_update and rehashed on login
+pwd_context = CryptContext(
+    schemes=["bcrypt", "argon2"],
+    default=settings.PASSWORD_HASH_SCHEME,
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    argon2__type="ID",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+T = TypeVar("T")
+
+# Password hashing is CPU bound (~250ms per bcrypt call); running it in a
+# small dedicated pool caps how many hashes run at once, so a login burst
+# queues here instead of occupying every request thread.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_lock = threading.Lock()
+_hash_pending = 0
+
+
+def _submit_hash_work(fn: Callable[..., T], *args: Any) -> "Future[T]":
+    global _hash_pending
+    with _hash_lock:
+        _hash_pending += 1
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(_hash_work_done)
+    return future
+
+
+def _hash_work_done(_future: "Future[Any]") -> None:
+    global _hash_pending
+    with _hash_lock:
+        _hash_pending -= 1
+
+
+def password_hash_queue_depth() -> int:
+    """
+    Number of hash operations submitted and not yet finished (running or queued).
+    """
+    return _hash_pending
 
 
 ALGORITHM = "HS256"
@@ -20,8 +68,34 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit_hash_work(
+        pwd_context.verify, plain_password, hashed_password
+    ).result()
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _submit_hash_work(pwd_context.hash, password).result()
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password and, if its hash uses outdated settings, return a new hash.
+    """
+    return _submit_hash_work(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    ).result()
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Like verify_and_update_password, but waits for the hash pool without
+    holding a request thread.
+    """
+    future = _submit_hash_work(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+    return await asyncio.wrap_future(future)
@@ -0,0 +1,201 @@
+"""
+Slow query log.
+
+Engine events (on the ``Engine`` class, so every engine is covered) time
+each statement. Statements slower than SLOW_QUERY_THRESHOLD_MS are logged
+with their normalized SQL, the shape of their parameters (names and types,
+never values), the duration and the app function that ran them, and kept in
+a ring buffer of the last SLOW_QUERY_LOG_SIZE slow statements.
+
+``SlowQueryLog.top()`` groups the buffer by statement shape, worst first, and
+``SlowQueryLog.explain()`` re-runs the slowest sample of the top SELECTs
+under ``EXPLAIN (ANALYZE, BUFFERS)`` in a rolled-back transaction, keeping
+the plan with the entry.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any
+
+from greenlet import getcurrent
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.querystats import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    statement: str
+    parameters: Any
+    params_shape: str
+    caller: str
+    seconds: float
+    at: datetime
+
+
+def params_shape(parameters: Any) -> str:
+    if isinstance(parameters, dict):
+        return (
+            "{"
+            + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items())
+            + "}"
+        )
+    if isinstance(parameters, list):
+        # executemany
+        return (
+            f"{len(parameters)} x {params_shape(parameters[0])}" if parameters else "[]"
+        )
+    if isinstance(parameters, tuple):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _app_caller(frame: FrameType | None) -> str | None:
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith("app.core."):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def find_caller() -> str:
+    """
+    Innermost function outside app.core (normally a CRUD function) on the
+    stack. Async sessions run statements in a greenlet whose stack starts at
+    the driver call, so the awaiting coroutine is looked up in the parent.
+    """
+    caller = _app_caller(sys._getframe(1))
+    if caller is None:
+        parent = getcurrent().parent
+        caller = _app_caller(parent.gr_frame if parent is not None else None)
+    return caller or "unknown"
+
+
+class SlowQueryLog:
+    def __init__(self, size: int) -> None:
+        self._lock = threading.Lock()
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+        self._plans: dict[str, str] = {}
+
+    def record(self, statement: str, parameters: Any, seconds: float) -> None:
+        entry = SlowQuery(
+            sql=normalize_sql(statement),
+            statement=statement,
+            parameters=parameters,
+            params_shape=params_shape(parameters),
+            caller=find_caller(),
+            seconds=seconds,
+            at=datetime.now(timezone.utc),
+        )
+        logger.warning(
+            "Slow query %.1f ms in %s: %s params=%s",
+            seconds * 1000,
+            entry.caller,
+            entry.sql,
+            entry.params_shape,
+        )
+        with self._lock:
+            self._entries.append(entry)
+
+    def top(self, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Slow statements in the buffer grouped by shape, slowest first.
+        """
+        with self._lock:
+            entries = list(self._entries)
+            plans = dict(self._plans)
+        groups: dict[str, dict[str, Any]] = {}
+        for entry in entries:
+            group = groups.get(entry.sql)
+            if group is None:
+                group = groups[entry.sql] = {
+                    "sql": entry.sql,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "worst": entry,
+                    "plan": plans.get(entry.sql),
+                }
+            group["count"] += 1
+            group["total_ms"] += entry.seconds * 1000
+            if entry.seconds > group["worst"].seconds:
+                group["worst"] = entry
+        ranked = sorted(groups.values(), key=lambda g: g["worst"].seconds, reverse=True)
+        return ranked[:limit]
+
+    def explain(self, limit: int = 5) -> list[dict[str, Any]]:
+        """
+        Capture ``EXPLAIN (ANALYZE, BUFFERS)`` for the top SELECT offenders.
+
+        ANALYZE executes the statement, so only SELECTs are explained, inside
+        a transaction that is rolled back.
+        """
+        top = self.top(limit)
+        for group in top:
+            worst = group["worst"]
+            if not worst.statement.lstrip().upper().startswith("SELECT"):
+                continue
+            try:
+                with engine.connect() as conn:
+                    rows = conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS) {worst.statement}",
+                        worst.parameters,
+                    ).all()
+                    conn.rollback()
+            except Exception as e:
+                logger.warning("EXPLAIN failed for %s: %s", group["sql"], e)
+                continue
+            group["plan"] = "\n".join(row[0] for row in rows)
+            with self._lock:
+                self._plans[group["sql"]] = group["plan"]
+        return top
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(
+    _conn: Any,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    if context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_slow(
+    _conn: Any,
+    _cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    start = getattr(context, "_slow_query_start", None)
+    if threshold <= 0 or start is None:
+        return
+    seconds = time.perf_counter() - start
+    if seconds * 1000 >= threshold and not statement.startswith("EXPLAIN"):
+        slow_query_log.record(statement, parameters, seconds)
@@ -0,0 +1,220 @@
+"""
+Token-bucket throttling of failed login attempts per username and per client IP.
+
+Before any password hashing, an attempt atomically takes a token from the
+username bucket and then from the client IP bucket; an empty bucket rejects
+it (a username token already taken is given back). Concurrent attempts
+therefore cannot all pass while the buckets still look full, so a burst
+queues at most a bucket's worth of hashes. A successful login gives its
+tokens back, so only failed attempts count against the limit. Buckets live
+in process memory by default, or in the ``loginthrottle`` table when
+LOGIN_THROTTLE_BACKEND is "database" so all workers share them.
+
+The client IP is ``request.client.host``; behind the proxy the server must be
+told to trust its forwarded headers (FORWARDED_ALLOW_IPS), otherwise every
+client shares the proxy's bucket.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Protocol
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import LoginThrottle
+
+
+class TokenBuckets(Protocol):
+    def consume(self, key: str) -> bool: ...
+
+    def refund(self, key: str) -> None: ...
+
+
+class MemoryTokenBuckets:
+    """
+    Per-process buckets; the least recently used ones are dropped beyond ``max_keys``.
+    """
+
+    def __init__(
+        self, capacity: int, refill_seconds: float, max_keys: int = 100_000
+    ) -> None:
+        self.capacity = capacity
+        self.rate = capacity / refill_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (tokens, monotonic time of last update)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _refilled(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def _set(self, key: str, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def consume(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, now)
+            allowed = tokens >= 1
+            self._set(key, max(tokens - 1, 0.0), now)
+            return allowed
+
+    def refund(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._set(key, min(self.capacity, self._refilled(key, now) + 1), now)
+
+
+class DatabaseTokenBuckets:
+    """
+    Buckets shared by all workers; each attempt is one atomic upsert.
+    """
+
+    # Delete full (idle) buckets every this many attempts
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, capacity: int, refill_seconds: float) -> None:
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.rate = capacity / refill_seconds
+        self._attempts = 0
+
+    def _refilled(self) -> Any:
+        elapsed = func.extract("epoch", func.now() - LoginThrottle.updated_at)
+        return func.least(self.capacity, LoginThrottle.tokens + elapsed * self.rate)
+
+    def consume(self, key: str) -> bool:
+        refilled = self._refilled()
+        statement = (
+            pg_insert(LoginThrottle)
+            .values(
+                key=key, tokens=self.capacity - 1, allowed=True, updated_at=func.now()
+            )
+            .on_conflict_do_update(
+                index_elements=[LoginThrottle.key],
+                set_={
+                    "tokens": func.greatest(refilled - 1, 0),
+                    "allowed": refilled >= 1,
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(col(LoginThrottle.allowed))
+        )
+        with Session(engine) as session:
+            allowed = bool(session.execute(statement).scalar_one())
+            self._attempts += 1
+            if self._attempts % self.CLEANUP_EVERY == 0:
+                # A bucket untouched for a full refill period is the same as no row
+                session.execute(
+                    delete(LoginThrottle).where(
+                        col(LoginThrottle.updated_at)
+                        < func.now() - timedelta(seconds=self.refill_seconds)
+                    )
+                )
+            session.commit()
+        return allowed
+
+    def refund(self, key: str) -> None:
+        statement = (
+            update(LoginThrottle)
+            .where(col(LoginThrottle.key) == key)
+            .values(
+                tokens=func.least(self.capacity, self._refilled() + 1),
+                updated_at=func.now(),
+            )
+        )
+        with Session(engine) as session:
+            session.execute(statement)
+            session.commit()
+
+
+class LoginLimiter:
+    def __init__(self) -> None:
+        refill = settings.LOGIN_THROTTLE_REFILL_SECONDS
+        buckets = (
+            DatabaseTokenBuckets
+            if settings.LOGIN_THROTTLE_BACKEND == "database"
+            else MemoryTokenBuckets
+        )
+        self._buckets: dict[str, TokenBuckets] = {
+            "username": buckets(settings.LOGIN_ATTEMPTS_PER_USERNAME, refill),
+            "ip": buckets(settings.LOGIN_ATTEMPTS_PER_IP, refill),
+        }
+        self.allowed = 0
+        self.rejected = dict.fromkeys(self._buckets, 0)
+
+    @property
+    def retry_after(self) -> int:
+        """
+        Seconds until the smallest bucket has regained a token.
+        """
+        return (
+            int(
+                settings.LOGIN_THROTTLE_REFILL_SECONDS
+                / min(
+                    settings.LOGIN_ATTEMPTS_PER_USERNAME, settings.LOGIN_ATTEMPTS_PER_IP
+                )
+            )
+            + 1
+        )
+
+    def _keys(self, username: str, client_ip: str) -> dict[str, str]:
+        return {"username": f"username:{username.lower()}", "ip": f"ip:{client_ip}"}
+
+    def acquire(self, username: str, client_ip: str) -> bool:
+        """
+        Take a token from both buckets before the password is checked;
+        False (nothing taken) when either bucket is empty.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return True
+        keys = self._keys(username, client_ip)
+        if not self._buckets["username"].consume(keys["username"]):
+            self.rejected["username"] += 1
+            return False
+        if not self._buckets["ip"].consume(keys["ip"]):
+            self._buckets["username"].refund(keys["username"])
+            self.rejected["ip"] += 1
+            return False
+        self.allowed += 1
+        return True
+
+    def release(self, username: str, client_ip: str) -> None:
+        """
+        Give back the tokens of an attempt whose password check succeeded.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        for kind, key in self._keys(username, client_ip).items():
+            self._buckets[kind].refund(key)
+
+    async def acquire_async(self, username: str, client_ip: str) -> bool:
+        if settings.LOGIN_THROTTLE_BACKEND == "database":
+            return await run_in_threadpool(self.acquire, username, client_ip)
+        return self.acquire(username, client_ip)
+
+    async def release_async(self, username: str, client_ip: str) -> None:
+        if settings.LOGIN_THROTTLE_BACKEND == "database":
+            await run_in_threadpool(self.release, username, client_ip)
+        else:
+            self.release(username, client_ip)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "allowed": self.allowed,
+            **{f"rejected_{kind}": count for kind, count in self.rejected.items()},
+        }
+
+
+login_limiter = LoginLimiter()
@@ -1,10 +1,25 @@
 import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
 from typing import Any, Optional, List
 
-from sqlmodel import Session, select
+from sqlalchemy import DateTime, and_, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, SQLModel, col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate, Teacher, Role, RoleCreate, RoleUpdate, TeacherCreate, TeacherUpdate, Subject, SubjectCreate, SubjectUpdate, Student, StudentCreate, StudentUpdate, Schedule, ScheduleCreate, ScheduleUpdate
+from app.core.cache import ReferenceCache
+from app.core.invalidation import publish
+from app.core.pagination import paginate, paginate_rows
+from app.core.security import (
+    get_password_hash,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.models import Item, ItemCreate, User, UserCreate, UserUpdate, Teacher, Role, RoleCreate, RoleUpdate, TeacherCreate, TeacherUpdate, Subject, SubjectCreate, SubjectUpdate, Student, StudentCreate, StudentUpdate, Schedule, ScheduleCreate, ScheduleUpdate, Course, CourseStudent, CourseStatus
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -12,6 +27,7 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
         user_create, update={"hashed_password": get_password_hash(user_create.password)}
     )
     session.add(db_obj)
+    publish(session, "user", db_obj.id)
     session.commit()
     session.refresh(db_obj)
     return db_obj
@@ -26,6 +42,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
+    publish(session, "user", db_user.id)
     session.commit()
     session.refresh(db_user)
     return db_user
@@ -41,22 +58,74 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        _upgrade_password_hash(session, db_user, new_hash)
+    return db_user
+
+
+def _upgrade_password_hash(session: Session, db_user: User, new_hash: str) -> None:
+    # 哈希方案或强度已调整，登录成功时顺便升级存储的哈希
+    db_user.hashed_password = new_hash
+    session.add(db_user)
+    publish(session, "user", db_user.id)
+    session.commit()
+    session.refresh(db_user)
+
+
+async def authenticate_async(*, session: Session, email: str, password: str) -> User | None:
+    """
+    authenticate 的异步版本：查询在线程池中执行，密码校验在哈希线程池中排队，
+    等待期间不占用请求线程
+    """
+    db_user = await run_in_threadpool(get_user_by_email, session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        await run_in_threadpool(_upgrade_password_hash, session, db_user, new_hash)
     return db_user
 
 
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
+    publish(session, "item", db_item.id)
     session.commit()
     session.refresh(db_item)
     return db_item
 
 
+# 列表分页的排序键，必须唯一且有对应索引，游标分页按它们做 keyset 查询
+TEACHER_ORDER = (Teacher.name, Teacher.id)
+ROLE_ORDER = (Role.name,)
+SUBJECT_ORDER = (Subject.name,)
+STUDENT_ORDER = (Student.name, Student.id)
+SCHEDULE_ORDER = (Schedule.id,)
+COURSE_ORDER = (Course.start_time, Course.id)
+
+
+def get_missing_ids(session, model: type[SQLModel], ids: Iterable[uuid.UUID]) -> List[uuid.UUID]:
+    """
+    用一条 IN 查询校验一组ID，返回数据库中不存在的ID（保持传入顺序、去重）
+    """
+    wanted = list(dict.fromkeys(ids))
+    if not wanted:
+        return []
+    found = set(session.exec(select(model.id).where(col(model.id).in_(wanted))).all())
+    return [item_id for item_id in wanted if item_id not in found]
+
+
 def create_teacher(session, teacher_in: TeacherCreate) -> Teacher:
     db_teacher = Teacher.model_validate(teacher_in)
     session.add(db_teacher)
+    publish(session, "teacher", db_teacher.id)
     session.commit()
     session.refresh(db_teacher)
     return db_teacher
@@ -64,27 +133,41 @@ def create_teacher(session, teacher_in: TeacherCreate) -> Teacher:
 def get_teacher(session, teacher_id: uuid.UUID) -> Optional[Teacher]:
     return session.get(Teacher, teacher_id)
 
-def get_teachers(session, skip: int = 0, limit: int = 100) -> List[dict]:
-    teachers = session.exec(select(Teacher).offset(skip).limit(limit)).all()
-    
-    # 转换为包含学科名称的格式
-    result = []
-    for teacher in teachers:
-        # 查询学科信息
-        subject = session.get(Subject, teacher.subject_id)
-        teacher_dict = {
-            "id": teacher.id,
-            "name": teacher.name,
-            "remark": teacher.remark,
-            "spell_name": teacher.spell_name,
-            "genders": teacher.genders,
-            "phone": teacher.phone,
-            "subject_id": teacher.subject_id,
-            "subject_name": subject.name if subject else None
-        }
-        result.append(teacher_dict)
-    
-    return result
+def _teachers_query(skip: int, limit: int, cursor: str | None):
+    # 只取列表需要的列，学科名称从缓存解析
+    statement = select(
+        Teacher.id,
+        Teacher.name,
+        Teacher.remark,
+        Teacher.spell_name,
+        Teacher.genders,
+        Teacher.phone,
+        Teacher.subject_id,
+    )
+    return paginate(statement, TEACHER_ORDER, skip=skip, limit=limit, cursor=cursor)
+
+
+def _with_subject_names(rows, subjects: dict) -> List[dict]:
+    return [
+        {**row, "subject_name": _subject_name_from(subjects, row["subject_id"])}
+        for row in rows
+    ]
+
+
+def get_teachers(session, skip: int = 0, limit: int = 100, cursor: str | None = None) -> List[dict]:
+    rows = session.execute(_teachers_query(skip, limit, cursor)).mappings()
+    return _with_subject_names(rows, subject_cache.get_all(session))
+
+
+async def get_teacher_async(session: AsyncSession, teacher_id: uuid.UUID) -> Optional[Teacher]:
+    return await session.get(Teacher, teacher_id)
+
+
+async def get_teachers_async(
+    session: AsyncSession, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> List[dict]:
+    result = await session.execute(_teachers_query(skip, limit, cursor))
+    return _with_subject_names(result.mappings(), await subject_cache.get_all_async(session))
 
 def update_teacher(session, teacher_id: uuid.UUID, teacher_in: TeacherUpdate) -> Optional[Teacher]:
     teacher = get_teacher(session, teacher_id)
@@ -94,6 +177,7 @@ def update_teacher(session, teacher_id: uuid.UUID, teacher_in: TeacherUpdate) ->
     for key, value in teacher_data.items():
         setattr(teacher, key, value)
     session.add(teacher)
+    publish(session, "teacher", teacher_id)
     session.commit()
     session.refresh(teacher)
     return teacher
@@ -103,14 +187,24 @@ def delete_teacher(session, teacher_id: uuid.UUID) -> bool:
     if not teacher:
         return False
     session.delete(teacher)
+    publish(session, "teacher", teacher_id)
     session.commit()
     return True
 
 
 # 角色CRUD操作
+def _load_roles(session) -> List[dict]:
+    return [role.model_dump() for role in session.exec(select(Role)).all()]
+
+
+# 角色是很少变化的参考数据，读取走进程内缓存
+role_cache = ReferenceCache("role", _load_roles)
+
+
 def create_role(session, role_in: RoleCreate) -> Role:
     db_role = Role.model_validate(role_in)
     session.add(db_role)
+    role_cache.mark_changed(session, db_role.id)
     session.commit()
     session.refresh(db_role)
     return db_role
@@ -120,8 +214,9 @@ def get_role(session, role_id: uuid.UUID) -> Optional[Role]:
     return session.get(Role, role_id)
 
 
-def get_roles(session, skip: int = 0, limit: int = 100) -> List[Role]:
-    return session.exec(select(Role).offset(skip).limit(limit)).all()
+def get_roles(session, skip: int = 0, limit: int = 100, cursor: str | None = None) -> List[dict]:
+    roles = role_cache.get_all(session).values()
+    return paginate_rows(list(roles), ROLE_ORDER, skip=skip, limit=limit, cursor=cursor)
 
 
 def update_role(session, role_id: uuid.UUID, role_in: RoleUpdate) -> Optional[Role]:
@@ -132,6 +227,7 @@ def update_role(session, role_id: uuid.UUID, role_in: RoleUpdate) -> Optional[Ro
     for key, value in role_data.items():
         setattr(role, key, value)
     session.add(role)
+    role_cache.mark_changed(session, role_id)
     session.commit()
     session.refresh(role)
     return role
@@ -142,14 +238,29 @@ def delete_role(session, role_id: uuid.UUID) -> bool:
     if not role:
         return False
     session.delete(role)
+    role_cache.mark_changed(session, role_id)
     session.commit()
     return True
 
 
 # 学科CRUD操作
+def _load_subjects(session) -> List[dict]:
+    return [subject.model_dump() for subject in session.exec(select(Subject)).all()]
+
+
+# 学科是很少变化的参考数据，列表中的学科名称都从进程内缓存解析
+subject_cache = ReferenceCache("subject", _load_subjects)
+
+
+def _subject_name_from(subjects: dict, subject_id: uuid.UUID | None) -> str | None:
+    subject = subjects.get(subject_id) if subject_id else None
+    return subject["name"] if subject else None
+
+
 def create_subject(session, subject_in: SubjectCreate) -> Subject:
     db_subject = Subject.model_validate(subject_in)
     session.add(db_subject)
+    subject_cache.mark_changed(session, db_subject.id)
     session.commit()
     session.refresh(db_subject)
     return db_subject
@@ -159,8 +270,9 @@ def get_subject(session, subject_id: uuid.UUID) -> Optional[Subject]:
     return session.get(Subject, subject_id)
 
 
-def get_subjects(session, skip: int = 0, limit: int = 100) -> List[Subject]:
-    return session.exec(select(Subject).offset(skip).limit(limit)).all()
+def get_subjects(session, skip: int = 0, limit: int = 100, cursor: str | None = None) -> List[dict]:
+    subjects = subject_cache.get_all(session).values()
+    return paginate_rows(list(subjects), SUBJECT_ORDER, skip=skip, limit=limit, cursor=cursor)
 
 
 def update_subject(session, subject_id: uuid.UUID, subject_in: SubjectUpdate) -> Optional[Subject]:
@@ -171,6 +283,7 @@ def update_subject(session, subject_id: uuid.UUID, subject_in: SubjectUpdate) ->
     for key, value in subject_data.items():
         setattr(subject, key, value)
     session.add(subject)
+    subject_cache.mark_changed(session, subject_id)
     session.commit()
     session.refresh(subject)
     return subject
@@ -181,6 +294,7 @@ def delete_subject(session, subject_id: uuid.UUID) -> bool:
     if not subject:
         return False
     session.delete(subject)
+    subject_cache.mark_changed(session, subject_id)
     session.commit()
     return True
 
@@ -189,6 +303,7 @@ def delete_subject(session, subject_id: uuid.UUID) -> bool:
 def create_student(session, student_in: StudentCreate) -> Student:
     db_student = Student.model_validate(student_in)
     session.add(db_student)
+    publish(session, "student", db_student.id)
     session.commit()
     session.refresh(db_student)
     return db_student
@@ -198,8 +313,19 @@ def get_student(session, student_id: uuid.UUID) -> Optional[Student]:
     return session.get(Student, student_id)
 
 
-def get_students(session, skip: int = 0, limit: int = 100) -> List[Student]:
-    return session.exec(select(Student).offset(skip).limit(limit)).all()
+def get_students(session, skip: int = 0, limit: int = 100, cursor: str | None = None) -> List[Student]:
+    return session.exec(paginate(select(Student), STUDENT_ORDER, skip=skip, limit=limit, cursor=cursor)).all()
+
+
+async def get_student_async(session: AsyncSession, student_id: uuid.UUID) -> Optional[Student]:
+    return await session.get(Student, student_id)
+
+
+async def get_students_async(
+    session: AsyncSession, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> List[Student]:
+    statement = paginate(select(Student), STUDENT_ORDER, skip=skip, limit=limit, cursor=cursor)
+    return list((await session.exec(statement)).all())
 
 
 def update_student(session, student_id: uuid.UUID, student_in: StudentUpdate) -> Optional[Student]:
@@ -210,6 +336,7 @@ def update_student(session, student_id: uuid.UUID, student_in: StudentUpdate) ->
     for key, value in student_data.items():
         setattr(student, key, value)
     session.add(student)
+    publish(session, "student", student_id)
     session.commit()
     session.refresh(student)
     return student
@@ -220,6 +347,7 @@ def delete_student(session, student_id: uuid.UUID) -> bool:
     if not student:
         return False
     session.delete(student)
+    publish(session, "student", student_id)
     session.commit()
     return True
 
@@ -228,6 +356,7 @@ def delete_student(session, student_id: uuid.UUID) -> bool:
 def create_schedule(session, schedule_in: ScheduleCreate) -> Schedule:
     db_schedule = Schedule.model_validate(schedule_in)
     session.add(db_schedule)
+    publish(session, "schedule", db_schedule.id)
     session.commit()
     session.refresh(db_schedule)
     return db_schedule
@@ -237,28 +366,23 @@ def get_schedule(session, schedule_id: uuid.UUID) -> Optional[Schedule]:
     return session.get(Schedule, schedule_id)
 
 
-def get_schedules(session, skip: int = 0, limit: int = 100) -> List[dict]:
-    schedules = session.exec(select(Schedule).offset(skip).limit(limit)).all()
-    
-    # 转换为包含教师信息的格式
-    result = []
-    for schedule in schedules:
-        # 查询教师信息
-        teacher = session.get(Teacher, schedule.teacher_id)
-        subject = session.get(Subject, teacher.subject_id) if teacher else None
-        
-        schedule_dict = {
-            "id": schedule.id,
-            "teacher_id": schedule.teacher_id,
-            "teacher_name": teacher.name if teacher else None,
-            "subject_name": subject.name if subject else None,
-            "hours": schedule.hours,
-            "fee": schedule.fee,
-            "remark": schedule.remark
-        }
-        result.append(schedule_dict)
-    
-    return result
+def get_schedules(session, skip: int = 0, limit: int = 100, cursor: str | None = None) -> List[dict]:
+    # 一次联表查询只取列表需要的列（含教师姓名），学科名称从缓存解析
+    statement = (
+        select(
+            Schedule.id,
+            Schedule.teacher_id,
+            Teacher.name.label("teacher_name"),
+            Teacher.subject_id,
+            Schedule.hours,
+            Schedule.fee,
+            Schedule.remark,
+        )
+        .outerjoin(Teacher, Teacher.id == Schedule.teacher_id)
+    )
+    statement = paginate(statement, SCHEDULE_ORDER, skip=skip, limit=limit, cursor=cursor)
+    rows = session.execute(statement).mappings()
+    return _with_subject_names(rows, subject_cache.get_all(session))
 
 
 def update_schedule(session, schedule_id: uuid.UUID, schedule_in: ScheduleUpdate) -> Optional[Schedule]:
@@ -269,6 +393,7 @@ def update_schedule(session, schedule_id: uuid.UUID, schedule_in: ScheduleUpdate
     for key, value in schedule_data.items():
         setattr(schedule, key, value)
     session.add(schedule)
+    publish(session, "schedule", schedule_id)
     session.commit()
     session.refresh(schedule)
     return schedule
@@ -279,31 +404,79 @@ def delete_schedule(session, schedule_id: uuid.UUID) -> bool:
     if not schedule:
         return False
     session.delete(schedule)
+    publish(session, "schedule", schedule_id)
     session.commit()
     return True
 
 # 课程安排CRUD操作
-def create_course(session, course_in: "CourseCreate") -> "Course":
-    from app.models import Course, CourseStudent
+def _insert_course_students(session, course_id: uuid.UUID, student_ids: List[uuid.UUID]) -> int:
+    """
+    用一条批量 INSERT ... ON CONFLICT DO NOTHING 添加课程-学生关联，
+    已存在的关联直接跳过，返回实际插入的行数
+    """
+    if not student_ids:
+        return 0
+    statement = pg_insert(CourseStudent).values([
+        {"id": uuid.uuid4(), "course_id": course_id, "student_id": student_id}
+        for student_id in dict.fromkeys(student_ids)
+    ]).on_conflict_do_nothing(constraint="uq_coursestudent_course_id_student_id")
+    return session.execute(statement).rowcount
+
+
+def _delete_course_students(session, course_id: uuid.UUID, student_ids: List[uuid.UUID]) -> int:
+    """
+    用一条批量 DELETE 移除课程-学生关联，返回删除的行数
+    """
+    if not student_ids:
+        return 0
+    result = session.execute(
+        delete(CourseStudent).where(
+            CourseStudent.course_id == course_id,
+            col(CourseStudent.student_id).in_(student_ids),
+        )
+    )
+    return result.rowcount
+
+
+def get_course_student_ids(session, course_id: uuid.UUID) -> List[uuid.UUID]:
+    """
+    获取课程当前的学生ID列表
+    """
+    return session.exec(
+        select(CourseStudent.student_id).where(CourseStudent.course_id == course_id)
+    ).all()
+
+
+def _sync_course_students(session, course_id: uuid.UUID, student_ids: List[uuid.UUID]) -> None:
+    """
+    按差集更新课程学生名单：只删除被移除的学生、只插入新增的学生，未变化的关联不做任何写入
+    """
+    current_ids = set(get_course_student_ids(session, course_id))
+    wanted_ids = list(dict.fromkeys(student_ids))
+    wanted_set = set(wanted_ids)
     
+    _delete_course_students(session, course_id, [sid for sid in current_ids if sid not in wanted_set])
+    _insert_course_students(session, course_id, [sid for sid in wanted_ids if sid not in current_ids])
+
+
+def create_course(session, course_in: "CourseCreate") -> dict:
+    """
+    在同一个事务中创建课程及其学生关联，返回新课程的详细信息
+    """
     # 创建课程
     course_data = course_in.model_dump(exclude={"student_ids"})
     db_course = Course.model_validate(course_data)
     session.add(db_course)
-    session.commit()
-    session.refresh(db_course)
+    session.flush()
     
-    # 添加学生关联
-    if course_in.student_ids:
-        for student_id in course_in.student_ids:
-            course_student = CourseStudent(
-                course_id=db_course.id,
-                student_id=student_id
-            )
-            session.add(course_student)
-        session.commit()
+    # 批量添加学生关联
+    _insert_course_students(session, db_course.id, course_in.student_ids)
     
-    return db_course
+    # 提交前读取详情，避免提交后再次刷新
+    course_detail = get_course_detail(session, db_course.id)
+    publish(session, "course", db_course.id)
+    session.commit()
+    return course_detail
 
 
 def get_course(session, course_id: uuid.UUID) -> Optional["Course"]:
@@ -311,60 +484,148 @@ def get_course(session, course_id: uuid.UUID) -> Optional["Course"]:
     return session.get(Course, course_id)
 
 
-def get_courses(session, skip: int = 0, limit: int = 100) -> List[dict]:
-    from app.models import Course, Schedule, Teacher, Subject, Student, CourseStudent
-    
-    courses = session.exec(select(Course).offset(skip).limit(limit)).all()
-    
+def _course_details_query():
+    """
+    课程详情查询：一次联表取出课程及其教师姓名、学科ID（学科名称从缓存解析）
+    """
+    return (
+        select(Course, Teacher.name, Teacher.subject_id)
+        .outerjoin(Schedule, Schedule.id == Course.schedule_id)
+        .outerjoin(Teacher, Teacher.id == Schedule.teacher_id)
+    )
+
+
+def _course_students_query(course_ids: List[uuid.UUID]):
+    return (
+        select(CourseStudent.course_id, Student)
+        .join(Student, Student.id == CourseStudent.student_id)
+        .where(col(CourseStudent.course_id).in_(course_ids))
+    )
+
+
+def _build_course_details(rows, student_rows, subjects: dict) -> List[dict]:
+    """
+    把课程行、学生行和学科缓存组装成课程详情
+    """
+    students_by_course: dict[uuid.UUID, List[dict]] = defaultdict(list)
+    for course_id, student in student_rows:
+        students_by_course[course_id].append({
+            "id": student.id,
+            "name": student.name,
+            "remark": student.remark,
+            "phone": student.phone,
+            "genders": student.genders,
+            "address": student.address
+        })
+
     result = []
-    for course in courses:
-        # 获取课表信息
-        schedule = session.get(Schedule, course.schedule_id)
-        teacher = None
-        subject = None
-        if schedule:
-            teacher = session.get(Teacher, schedule.teacher_id)
-            if teacher:
-                subject = session.get(Subject, teacher.subject_id)
-        
-        # 获取学生信息
-        students = []
-        course_students = session.exec(
-            select(CourseStudent).where(CourseStudent.course_id == course.id)
-        ).all()
-        
-        for cs in course_students:
-            student = session.get(Student, cs.student_id)
-            if student:
-                students.append({
-                    "id": student.id,
-                    "name": student.name,
-                    "remark": student.remark,
-                    "phone": student.phone,
-                    "genders": student.genders,
-                    "address": student.address
-                })
-        
-        course_dict = {
+    for course, teacher_name, subject_id in rows:
+        result.append({
             "id": course.id,
             "schedule_id": course.schedule_id,
-            "teacher_name": teacher.name if teacher else None,
-            "subject_name": subject.name if subject else None,
+            "teacher_name": teacher_name,
+            "subject_name": _subject_name_from(subjects, subject_id),
             "start_time": course.start_time,
             "end_time": course.end_time,
             "address": course.address,
             "status": course.status,
             "remark": course.remark,
-            "students": students
-        }
-        result.append(course_dict)
-    
+            "students": students_by_course[course.id]
+        })
+
     return result
 
 
+def _load_course_details(session, statement) -> List[dict]:
+    """
+    执行课程详情查询，并用一次批量查询补齐所有课程的学生信息。
+    无论分页大小，总共只发出两条查询。
+    """
+    rows = session.exec(statement).all()
+    if not rows:
+        return []
+    student_rows = session.exec(_course_students_query([course.id for course, _, _ in rows])).all()
+    return _build_course_details(rows, student_rows, subject_cache.get_all(session))
+
+
+async def _load_course_details_async(session: AsyncSession, statement) -> List[dict]:
+    rows = (await session.exec(statement)).all()
+    if not rows:
+        return []
+    student_rows = (
+        await session.exec(_course_students_query([course.id for course, _, _ in rows]))
+    ).all()
+    return _build_course_details(rows, student_rows, await subject_cache.get_all_async(session))
+
+
+def _courses_query(
+    skip: int,
+    limit: int,
+    start_from: datetime | None,
+    start_to: datetime | None,
+    teacher_id: uuid.UUID | None,
+    status: CourseStatus | None,
+    cursor: str | None,
+):
+    statement = _course_details_query()
+    if start_from is not None:
+        statement = statement.where(Course.start_time >= start_from)
+    if start_to is not None:
+        statement = statement.where(Course.start_time < start_to)
+    if teacher_id is not None:
+        statement = statement.where(Schedule.teacher_id == teacher_id)
+    if status is not None:
+        statement = statement.where(Course.status == status)
+    return paginate(statement, COURSE_ORDER, skip=skip, limit=limit, cursor=cursor)
+
+
+def get_courses(
+    session,
+    skip: int = 0,
+    limit: int = 100,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    teacher_id: uuid.UUID | None = None,
+    status: CourseStatus | None = None,
+    cursor: str | None = None,
+) -> List[dict]:
+    """
+    获取课程列表，按开始时间排序，可按开始时间区间 [start_from, start_to)、教师和状态筛选
+    """
+    statement = _courses_query(skip, limit, start_from, start_to, teacher_id, status, cursor)
+    return _load_course_details(session, statement)
+
+
+async def get_courses_async(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    teacher_id: uuid.UUID | None = None,
+    status: CourseStatus | None = None,
+    cursor: str | None = None,
+) -> List[dict]:
+    statement = _courses_query(skip, limit, start_from, start_to, teacher_id, status, cursor)
+    return await _load_course_details_async(session, statement)
+
+
+def get_course_detail(session, course_id: uuid.UUID) -> Optional[dict]:
+    """
+    根据ID获取单个课程的详细信息（课表、教师、学科、学生）
+    """
+    statement = _course_details_query().where(Course.id == course_id)
+    courses = _load_course_details(session, statement)
+    return courses[0] if courses else None
+
+
+async def get_course_detail_async(session: AsyncSession, course_id: uuid.UUID) -> Optional[dict]:
+    statement = _course_details_query().where(Course.id == course_id)
+    courses = await _load_course_details_async(session, statement)
+    return courses[0] if courses else None
+
+
 def update_course(session, course_id: uuid.UUID, course_in: "CourseUpdate") -> Optional["Course"]:
-    from app.models import Course, CourseStudent
-    
     course = get_course(session, course_id)
     if not course:
         return None
@@ -376,27 +637,153 @@ def update_course(session, course_id: uuid.UUID, course_in: "CourseUpdate") -> O
     
     # 更新学生关联
     if course_in.student_ids is not None:
-        # 删除现有关联
-        existing_course_students = session.exec(
-            select(CourseStudent).where(CourseStudent.course_id == course_id)
-        ).all()
-        for cs in existing_course_students:
-            session.delete(cs)
-        
-        # 添加新的关联
-        for student_id in course_in.student_ids:
-            course_student = CourseStudent(
-                course_id=course_id,
-                student_id=student_id
-            )
-            session.add(course_student)
+        _sync_course_students(session, course_id, course_in.student_ids)
     
     session.add(course)
+    publish(session, "course", course_id)
     session.commit()
     session.refresh(course)
     return course
 
 
+def add_course_students(session, course_id: uuid.UUID, student_ids: List[uuid.UUID]) -> int:
+    """
+    为课程添加学生，已加入的学生由唯一约束跳过，返回新增数量
+    """
+    added = _insert_course_students(session, course_id, student_ids)
+    publish(session, "course", course_id)
+    session.commit()
+    return added
+
+
+def remove_course_students(session, course_id: uuid.UUID, student_ids: List[uuid.UUID]) -> int:
+    """
+    从课程中移除学生，返回实际移除的数量
+    """
+    removed = _delete_course_students(session, course_id, list(dict.fromkeys(student_ids)))
+    if not removed:
+        # 没有删除任何记录，不提交也不发送缓存失效通知
+        session.rollback()
+        return 0
+    publish(session, "course", course_id)
+    session.commit()
+    return removed
+
+
+def _course_time_range(course):
+    """
+    课程时间段 [start_time, end_time)，与 ix_course_time_range GiST 索引的表达式一致
+    """
+    return func.tstzrange(course.start_time, course.end_time)
+
+
+def _time_range(start_time: datetime, end_time: datetime):
+    return func.tstzrange(
+        literal(start_time, DateTime(timezone=True)),
+        literal(end_time, DateTime(timezone=True)),
+    )
+
+
+def find_course_conflicts(
+    session,
+    start_time: datetime,
+    end_time: datetime,
+    teacher_ids: Iterable[uuid.UUID] = (),
+    student_ids: Iterable[uuid.UUID] = (),
+    exclude_course_id: uuid.UUID | None = None,
+) -> List[dict]:
+    """
+    查找与给定时间段重叠、且占用了这些教师或学生的课程（已取消的课程除外）
+    """
+    filters = [
+        _course_time_range(Course).op("&&")(_time_range(start_time, end_time)),
+        Course.status != CourseStatus.CANCELLED,
+    ]
+    if exclude_course_id is not None:
+        filters.append(Course.id != exclude_course_id)
+
+    conflicts = []
+    teacher_ids = list(dict.fromkeys(teacher_ids))
+    if teacher_ids:
+        rows = session.exec(
+            select(Schedule.teacher_id, Course.id, Course.start_time, Course.end_time)
+            .join(Schedule, Schedule.id == Course.schedule_id)
+            .where(col(Schedule.teacher_id).in_(teacher_ids), *filters)
+        ).all()
+        conflicts.extend(
+            {"kind": "teacher", "resource_id": teacher_id, "course_id": course_id, "start_time": start, "end_time": end}
+            for teacher_id, course_id, start, end in rows
+        )
+
+    student_ids = list(dict.fromkeys(student_ids))
+    if student_ids:
+        rows = session.exec(
+            select(CourseStudent.student_id, Course.id, Course.start_time, Course.end_time)
+            .join(CourseStudent, CourseStudent.course_id == Course.id)
+            .where(col(CourseStudent.student_id).in_(student_ids), *filters)
+        ).all()
+        conflicts.extend(
+            {"kind": "student", "resource_id": student_id, "course_id": course_id, "start_time": start, "end_time": end}
+            for student_id, course_id, start, end in rows
+        )
+
+    return conflicts
+
+
+def get_course_conflict_report(session, start_from: datetime, start_to: datetime) -> List[dict]:
+    """
+    审计一个时间段（如整个学期）内所有开始的课程，列出时间重叠且共用教师或学生的课程对
+    """
+    course_a = aliased(Course)
+    course_b = aliased(Course)
+    filters = [
+        course_a.start_time >= start_from,
+        course_a.start_time < start_to,
+        course_a.status != CourseStatus.CANCELLED,
+        course_b.status != CourseStatus.CANCELLED,
+        _course_time_range(course_b).op("&&")(_course_time_range(course_a)),
+    ]
+
+    # 同一教师的重叠课程
+    schedule_a = aliased(Schedule)
+    schedule_b = aliased(Schedule)
+    teacher_rows = session.exec(
+        select(schedule_a.teacher_id, course_a.id, course_b.id)
+        .join(schedule_a, schedule_a.id == course_a.schedule_id)
+        .join(schedule_b, schedule_b.teacher_id == schedule_a.teacher_id)
+        .join(course_b, and_(course_b.schedule_id == schedule_b.id, course_b.id != course_a.id))
+        .where(*filters)
+    ).all()
+
+    # 同一学生的重叠课程
+    enrollment_a = aliased(CourseStudent)
+    enrollment_b = aliased(CourseStudent)
+    student_rows = session.exec(
+        select(enrollment_a.student_id, course_a.id, course_b.id)
+        .join(enrollment_a, enrollment_a.course_id == course_a.id)
+        .join(enrollment_b, and_(enrollment_b.student_id == enrollment_a.student_id, enrollment_b.course_id != course_a.id))
+        .join(course_b, course_b.id == enrollment_b.course_id)
+        .where(*filters)
+    ).all()
+
+    # 每对课程只报告一次
+    report = []
+    seen = set()
+    for kind, rows in (("teacher", teacher_rows), ("student", student_rows)):
+        for resource_id, course_id, other_course_id in rows:
+            pair = tuple(sorted((course_id, other_course_id)))
+            if (kind, resource_id, pair) in seen:
+                continue
+            seen.add((kind, resource_id, pair))
+            report.append({
+                "kind": kind,
+                "resource_id": resource_id,
+                "course_id": pair[0],
+                "other_course_id": pair[1],
+            })
+    return report
+
+
 def delete_course(session, course_id: uuid.UUID) -> bool:
     from app.models import Course, CourseStudent
     
@@ -413,18 +800,18 @@ def delete_course(session, course_id: uuid.UUID) -> bool:
     
     # 删除课程
     session.delete(course)
+    publish(session, "course", course_id)
     session.commit()
     return True
 
 
-def get_student_courses(session, student_id: uuid.UUID, status: str | None = None, skip: int = 0, limit: int = 100) -> List[dict]:
-    """
-    获取学生参加的课程列表，支持按课程状态筛选
-    """
-    from app.models import Course, Schedule, Teacher, Subject, Student, CourseStudent, CourseStatus
-    
+def _student_courses_query(student_id: uuid.UUID, status: str | None, skip: int, limit: int):
     # 构建查询条件
-    query = select(Course).join(CourseStudent).where(CourseStudent.student_id == student_id)
+    query = (
+        _course_details_query()
+        .join(CourseStudent, CourseStudent.course_id == Course.id)
+        .where(CourseStudent.student_id == student_id)
+    )
     
     # 如果指定了状态，添加状态筛选条件
     if status:
@@ -432,55 +819,27 @@ def get_student_courses(session, student_id: uuid.UUID, status: str | None = Non
             course_status = CourseStatus(status)
             query = query.where(Course.status == course_status)
         except ValueError:
-            # 如果状态值无效，返回空列表
-            return []
-    
-    # 添加分页
-    query = query.offset(skip).limit(limit)
-    
-    courses = session.exec(query).all()
-    
-    result = []
-    for course in courses:
-        # 获取课表信息
-        schedule = session.get(Schedule, course.schedule_id)
-        teacher = None
-        subject = None
-        if schedule:
-            teacher = session.get(Teacher, schedule.teacher_id)
-            if teacher:
-                subject = session.get(Subject, teacher.subject_id)
-        
-        # 获取该课程的所有学生信息
-        students = []
-        course_students = session.exec(
-            select(CourseStudent).where(CourseStudent.course_id == course.id)
-        ).all()
-        
-        for cs in course_students:
-            student = session.get(Student, cs.student_id)
-            if student:
-                students.append({
-                    "id": student.id,
-                    "name": student.name,
-                    "remark": student.remark,
-                    "phone": student.phone,
-                    "genders": student.genders,
-                    "address": student.address
-                })
-        
-        course_dict = {
-            "id": course.id,
-            "schedule_id": course.schedule_id,
-            "teacher_name": teacher.name if teacher else None,
-            "subject_name": subject.name if subject else None,
-            "start_time": course.start_time,
-            "end_time": course.end_time,
-            "address": course.address,
-            "status": course.status,
-            "remark": course.remark,
-            "students": students
-        }
-        result.append(course_dict)
+            # 如果状态值无效，返回 None 表示结果为空
+            return None
     
-    return result
+    # 按上课时间排序后分页，保证翻页结果稳定
+    return paginate(query, COURSE_ORDER, skip=skip, limit=limit)
+
+
+def get_student_courses(session, student_id: uuid.UUID, status: str | None = None, skip: int = 0, limit: int = 100) -> List[dict]:
+    """
+    获取学生参加的课程列表，支持按课程状态筛选
+    """
+    query = _student_courses_query(student_id, status, skip, limit)
+    if query is None:
+        return []
+    return _load_course_details(session, query)
+
+
+async def get_student_courses_async(
+    session: AsyncSession, student_id: uuid.UUID, status: str | None = None, skip: int = 0, limit: int = 100
+) -> List[dict]:
+    query = _student_courses_query(student_id, status, skip, limit)
+    if query is None:
+        return []
+    return await _load_course_details_async(session, query)
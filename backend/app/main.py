@@ -1,10 +1,23 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.deps import verify_metrics_token
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.email_queue import EmailWorker
+from app.core.invalidation import InvalidationListener
+from app.core.metrics import MetricsMiddleware, generate_metrics, mark_worker_stopped
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from app.core.querystats import QUERY_COUNT_HEADER, QueryStatsMiddleware
+from app.core.replica import replica_monitor
+from app.utils import load_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,8 +27,32 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # 每个 worker 各自监听缓存失效通知
+    listener = InvalidationListener() if settings.CACHE_INVALIDATION_ENABLED else None
+    if listener:
+        listener.start()
+    load_email_templates()
+    # 只读副本延迟监控（未配置副本时不启动）
+    replica_monitor.start()
+    # 后台发送邮件队列
+    email_worker = EmailWorker() if settings.emails_enabled else None
+    if email_worker:
+        email_worker.start()
+    yield
+    if email_worker:
+        email_worker.stop()
+    replica_monitor.stop()
+    if listener:
+        listener.stop()
+    mark_worker_stopped()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -30,6 +67,31 @@ if settings.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER],
     )
 
+# 统计每个请求的 SQL 语句数与耗时，非生产环境通过响应头返回
+app.add_middleware(
+    QueryStatsMiddleware, expose_headers=settings.ENVIRONMENT != "production"
+)
+# Prometheus 指标，按路由 unique id 统计
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(InvalidCursorError)
+def invalid_cursor_handler(_request: Request, _exc: InvalidCursorError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": "Invalid cursor"})
+
+
+# 指标接口需携带 METRICS_TOKEN（本地环境未配置时不校验）
+@app.get(
+    "/metrics",
+    tags=["metrics"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_token)],
+)
+def metrics() -> Response:
+    return Response(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,9 +1,15 @@
 import uuid
+from datetime import datetime
+from typing import Literal
+from zoneinfo import ZoneInfo
 
-from pydantic import EmailStr
+from pydantic import EmailStr, field_validator, model_validator
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Column
+from sqlalchemy import Column, DateTime, Index, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSON
+from typing_extensions import Self
+
+from app.core.config import settings
 
 
 # Shared properties
@@ -115,6 +121,22 @@ class NewPassword(SQLModel):
     new_password: str = Field(min_length=8, max_length=40)
 
 
+# 缓存版本表：写入时递增，各进程据此判断本地缓存是否过期
+class CacheVersion(SQLModel, table=True):
+    name: str = Field(primary_key=True, max_length=64, description="缓存名称")
+    version: int = Field(default=0, nullable=False, description="缓存版本号")
+
+
+# 登录限流令牌桶：LOGIN_THROTTLE_BACKEND 为 database 时多进程共享
+class LoginThrottle(SQLModel, table=True):
+    key: str = Field(primary_key=True, max_length=320, description="限流键（用户名或IP）")
+    tokens: float = Field(nullable=False, description="剩余令牌数")
+    allowed: bool = Field(default=True, nullable=False, description="最近一次尝试是否放行")
+    updated_at: datetime = Field(
+        sa_type=DateTime(timezone=True), nullable=False, index=True, description="最近更新时间"
+    )
+
+
 # 学科模型
 class Subject(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -155,13 +177,16 @@ class RoleUpdate(SQLModel):
 
 
 class Teacher(SQLModel, table=True):
+    # 列表按 (name, id) 排序和游标分页
+    __table_args__ = (Index("ix_teacher_name_id", "name", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(max_length=255, nullable=False, description="教师姓名")
     remark: str = Field(max_length=255, nullable=False, description="教师备注")
     spell_name: str = Field(max_length=255, nullable=False, description="教师姓名的拼音")
     genders: int = Field(nullable=False, description="教师性别，0为女性，1为男性")
     phone: str | None = Field(default=None, max_length=11, min_length=11, description="教师的电话号码")
-    subject_id: uuid.UUID = Field(foreign_key="subject.id", nullable=False, description="教师学科ID")
+    subject_id: uuid.UUID = Field(foreign_key="subject.id", nullable=False, index=True, description="教师学科ID")
     subject: Subject | None = Relationship(back_populates="teachers")
     schedules: list["Schedule"] = Relationship(back_populates="teacher")
 
@@ -200,6 +225,9 @@ class TeacherWithSubject(SQLModel):
 
 # 学生模型
 class Student(SQLModel, table=True):
+    # 列表按 (name, id) 排序和游标分页
+    __table_args__ = (Index("ix_student_name_id", "name", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(max_length=255, nullable=False, description="学生姓名")
     remark: str | None = Field(default=None, max_length=255, description="学生备注")
@@ -229,7 +257,7 @@ class StudentUpdate(SQLModel):
 # 课表模型
 class Schedule(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    teacher_id: uuid.UUID = Field(foreign_key="teacher.id", nullable=False, description="教师ID")
+    teacher_id: uuid.UUID = Field(foreign_key="teacher.id", nullable=False, index=True, description="教师ID")
     teacher: Teacher | None = Relationship(back_populates="schedules")
     hours: int = Field(nullable=False, description="课时数")
     fee: float = Field(nullable=False, description="费用")
@@ -276,44 +304,99 @@ class CourseStatus(str, Enum):
 
 # 课程安排模型
 class Course(SQLModel, table=True):
+    # 时间区间 GiST 索引，用于按时间段查询课程
+    __table_args__ = (
+        Index(
+            "ix_course_time_range",
+            text("tstzrange(start_time, end_time)"),
+            postgresql_using="gist",
+        ),
+        # 列表按 (start_time, id) 排序和游标分页，同时服务开始时间区间筛选
+        Index("ix_course_start_time_id", "start_time", "id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    schedule_id: uuid.UUID = Field(foreign_key="schedule.id", nullable=False, description="课表ID")
+    schedule_id: uuid.UUID = Field(foreign_key="schedule.id", nullable=False, index=True, description="课表ID")
     schedule: Schedule | None = Relationship(back_populates="courses")
-    start_time: str = Field(nullable=False, description="课程开始时间，格式：YYYY-MM-DD HH:MM")
-    end_time: str = Field(nullable=False, description="课程结束时间，格式：YYYY-MM-DD HH:MM")
+    start_time: datetime = Field(sa_type=DateTime(timezone=True), nullable=False, description="课程开始时间")
+    end_time: datetime = Field(sa_type=DateTime(timezone=True), nullable=False, description="课程结束时间")
     address: str = Field(max_length=500, nullable=False, description="上课地址")
-    status: CourseStatus = Field(default=CourseStatus.NOT_STARTED, description="课程状态")
+    status: CourseStatus = Field(default=CourseStatus.NOT_STARTED, index=True, description="课程状态")
     remark: str | None = Field(default=None, max_length=500, description="备注")
 
 
 # 课程-学生关联表
 class CourseStudent(SQLModel, table=True):
+    # (course_id, student_id) 唯一，同时作为按 course_id 查询的索引
+    __table_args__ = (
+        UniqueConstraint("course_id", "student_id", name="uq_coursestudent_course_id_student_id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     course_id: uuid.UUID = Field(foreign_key="course.id", nullable=False)
-    student_id: uuid.UUID = Field(foreign_key="student.id", nullable=False)
+    student_id: uuid.UUID = Field(foreign_key="student.id", nullable=False, index=True)
+
+
+def _with_default_timezone(value: datetime | None) -> datetime | None:
+    # 未带时区的时间按 settings.TIMEZONE 处理
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo(settings.TIMEZONE))
+    return value
 
 
 # 课程创建模型
 class CourseCreate(SQLModel):
     schedule_id: uuid.UUID = Field(description="课表ID")
-    start_time: str = Field(description="课程开始时间，格式：YYYY-MM-DD HH:MM")
-    end_time: str = Field(description="课程结束时间，格式：YYYY-MM-DD HH:MM")
+    start_time: datetime = Field(description="课程开始时间，如 YYYY-MM-DD HH:MM，未带时区时按 settings.TIMEZONE 处理")
+    end_time: datetime = Field(description="课程结束时间，如 YYYY-MM-DD HH:MM，未带时区时按 settings.TIMEZONE 处理")
     address: str = Field(max_length=500, description="上课地址")
     status: CourseStatus = Field(default=CourseStatus.NOT_STARTED, description="课程状态")
     remark: str | None = Field(default=None, max_length=500, description="备注")
     student_ids: list[uuid.UUID] = Field(default=[], description="学生ID列表")
 
+    _default_timezone = field_validator("start_time", "end_time")(_with_default_timezone)
+
+    @model_validator(mode="after")
+    def _check_time_range(self) -> Self:
+        if self.end_time <= self.start_time:
+            raise ValueError("结束时间必须晚于开始时间")
+        return self
+
 
 # 课程更新模型
 class CourseUpdate(SQLModel):
     schedule_id: uuid.UUID | None = Field(default=None, description="课表ID")
-    start_time: str | None = Field(default=None, description="课程开始时间，格式：YYYY-MM-DD HH:MM")
-    end_time: str | None = Field(default=None, description="课程结束时间，格式：YYYY-MM-DD HH:MM")
+    start_time: datetime | None = Field(default=None, description="课程开始时间，如 YYYY-MM-DD HH:MM，未带时区时按 settings.TIMEZONE 处理")
+    end_time: datetime | None = Field(default=None, description="课程结束时间，如 YYYY-MM-DD HH:MM，未带时区时按 settings.TIMEZONE 处理")
     address: str | None = Field(default=None, max_length=500, description="上课地址")
     status: CourseStatus | None = Field(default=None, description="课程状态")
     remark: str | None = Field(default=None, max_length=500, description="备注")
     student_ids: list[uuid.UUID] | None = Field(default=None, description="学生ID列表")
 
+    _default_timezone = field_validator("start_time", "end_time")(_with_default_timezone)
+
+
+# 课程学生增减模型
+class CourseStudentIds(SQLModel):
+    student_ids: list[uuid.UUID] = Field(min_length=1, description="学生ID列表")
+
+
+# 课程时间冲突：与候选时间段重叠的已有课程
+class CourseConflict(SQLModel):
+    kind: Literal["teacher", "student"] = Field(description="冲突类型：教师或学生")
+    resource_id: uuid.UUID = Field(description="冲突的教师ID或学生ID")
+    course_id: uuid.UUID = Field(description="已占用该时间段的课程ID")
+    start_time: datetime
+    end_time: datetime
+
+
+# 课程时间冲突报告：两门时间重叠且共用教师或学生的课程
+class CourseConflictPair(SQLModel):
+    kind: Literal["teacher", "student"] = Field(description="冲突类型：教师或学生")
+    resource_id: uuid.UUID = Field(description="冲突的教师ID或学生ID")
+    course_id: uuid.UUID
+    other_course_id: uuid.UUID
+
 
 # 课程响应模型（包含详细信息）
 class CourseWithDetails(SQLModel):
@@ -321,8 +404,8 @@ class CourseWithDetails(SQLModel):
     schedule_id: uuid.UUID
     teacher_name: str | None = None
     subject_name: str | None = None
-    start_time: str
-    end_time: str
+    start_time: datetime
+    end_time: datetime
     address: str
     status: CourseStatus
     remark: str | None = None
@@ -340,3 +423,47 @@ class StudentPublic(SQLModel):
 
 
 
+
+
+# 邮件发送状态
+class EmailStatus(str, Enum):
+    PENDING = "pending"  # 待发送（含等待重试）
+    SENDING = "sending"  # 已被发送线程领取，租约到期前其他线程不会再领取
+    SENT = "sent"        # 已发送
+    FAILED = "failed"    # 重试次数用尽
+
+
+# 待发送邮件队列表，由后台线程批量取出发送
+class EmailOutbox(SQLModel, table=True):
+    __table_args__ = (
+        # 发送线程按 (status, next_attempt_at) 取到期的待发送邮件
+        Index("ix_emailoutbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255, nullable=False, description="收件人")
+    subject: str = Field(max_length=998, nullable=False, description="主题")
+    html_content: str = Field(sa_type=Text, nullable=False, description="HTML正文")
+    status: EmailStatus = Field(default=EmailStatus.PENDING, description="发送状态")
+    attempts: int = Field(default=0, nullable=False, description="已尝试次数")
+    last_error: str | None = Field(default=None, max_length=1000, description="最近一次失败原因")
+    created_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False, description="入队时间")
+    next_attempt_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False, description="下次发送时间")
+    sent_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True), description="发送成功时间")
+
+
+# 慢查询（按语句形态汇总），仅超级管理员可见
+class SlowQueryPublic(SQLModel):
+    sql: str = Field(description="归一化后的SQL")
+    params_shape: str = Field(description="参数名称与类型")
+    caller: str = Field(description="执行该语句的函数")
+    count: int = Field(description="缓冲区内的次数")
+    max_ms: float = Field(description="最长耗时（毫秒）")
+    total_ms: float = Field(description="累计耗时（毫秒）")
+    last_seen: datetime = Field(description="最长一次的执行时间")
+    plan: str | None = Field(default=None, description="EXPLAIN (ANALYZE, BUFFERS) 结果")
+
+
+class SlowQueriesPublic(SQLModel):
+    data: list[SlowQueryPublic]
+    count: int
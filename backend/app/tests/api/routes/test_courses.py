@@ -0,0 +1,173 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.querystats import QUERY_COUNT_HEADER
+from app.tests.utils.course import (
+    create_random_course,
+    create_random_schedule,
+    create_random_student,
+)
+
+
+def test_read_course(client: TestClient, db: Session) -> None:
+    student = create_random_student(db)
+    course = create_random_course(db, students=[student])
+    response = client.get(f"{settings.API_V1_STR}/courses/{course['id']}")
+    assert response.status_code == 200
+    content = response.json()
+    assert content["id"] == str(course["id"])
+    assert content["schedule_id"] == str(course["schedule_id"])
+    assert content["teacher_name"]
+    assert [s["id"] for s in content["students"]] == [str(student.id)]
+
+
+def test_read_course_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/courses/{uuid.uuid4()}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "课程安排不存在"
+
+
+def test_create_course(client: TestClient, db: Session) -> None:
+    schedule = create_random_schedule(db)
+    student = create_random_student(db)
+    data = {
+        "schedule_id": str(schedule.id),
+        "start_time": "2025-09-02 08:00",
+        "end_time": "2025-09-02 09:30",
+        "address": "Room 101",
+        "student_ids": [str(student.id)],
+    }
+    response = client.post(f"{settings.API_V1_STR}/courses/", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["schedule_id"] == data["schedule_id"]
+    assert content["address"] == data["address"]
+    assert [s["id"] for s in content["students"]] == [str(student.id)]
+
+
+def test_create_course_missing_students(client: TestClient, db: Session) -> None:
+    schedule = create_random_schedule(db)
+    student = create_random_student(db)
+    missing = [str(uuid.uuid4()), str(uuid.uuid4())]
+    data = {
+        "schedule_id": str(schedule.id),
+        "start_time": "2025-09-02 08:00",
+        "end_time": "2025-09-02 09:30",
+        "address": "Room 101",
+        "student_ids": [missing[0], str(student.id), missing[1]],
+    }
+    response = client.post(f"{settings.API_V1_STR}/courses/", json=data)
+    assert response.status_code == 404
+    assert response.json()["detail"] == {
+        "message": "学生不存在",
+        "missing_ids": missing,
+    }
+
+
+def test_add_and_remove_course_students(client: TestClient, db: Session) -> None:
+    students = [create_random_student(db) for _ in range(3)]
+    course = create_random_course(db, students=students[:1])
+    url = f"{settings.API_V1_STR}/courses/{course['id']}/students"
+
+    response = client.post(url, json={"student_ids": [str(s.id) for s in students]})
+    assert response.status_code == 200
+    assert {s["id"] for s in response.json()["students"]} == {
+        str(s.id) for s in students
+    }
+
+    response = client.delete(
+        url, params={"student_ids": [str(s.id) for s in students[:2]]}
+    )
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()["students"]] == [str(students[2].id)]
+
+    response = client.delete(f"{url}/{students[2].id}")
+    assert response.status_code == 200
+    assert response.json()["students"] == []
+
+    response = client.delete(f"{url}/{students[2].id}")
+    assert response.status_code == 404
+
+
+def test_list_courses_filtered_by_time_and_teacher(
+    client: TestClient, db: Session
+) -> None:
+    course = create_random_course(db)
+    schedule = crud.get_schedule(db, course["schedule_id"])
+    assert schedule
+    params = {"teacher_id": str(schedule.teacher_id), "status": "not_started"}
+
+    response = client.get(
+        f"{settings.API_V1_STR}/courses/",
+        params={**params, "from": "2025-09-01 00:00", "to": "2025-09-02 00:00"},
+    )
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == [str(course["id"])]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/courses/",
+        params={**params, "from": "2025-09-02 00:00"},
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_list_courses_query_budget(client: TestClient, db: Session) -> None:
+    students = [create_random_student(db) for _ in range(2)]
+    for _ in range(3):
+        create_random_course(db, students=students)
+    url = f"{settings.API_V1_STR}/courses/"
+    client.get(url, params={"limit": 1})
+    # 课程和学生各一次查询，与返回的课程数无关
+    response = client.get(url, params={"limit": 50})
+    assert response.status_code == 200
+    assert len(response.json()) >= 3
+    assert int(response.headers[QUERY_COUNT_HEADER]) <= 2
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_create_course_student_conflict(client: TestClient, db: Session) -> None:
+    student = create_random_student(db)
+    course = create_random_course(db, students=[student])
+    schedule = create_random_schedule(db)
+    data = {
+        "schedule_id": str(schedule.id),
+        "start_time": "2025-09-01 09:00",
+        "end_time": "2025-09-01 10:00",
+        "address": "Room 102",
+        "student_ids": [str(student.id)],
+    }
+    response = client.post(f"{settings.API_V1_STR}/courses/", json=data)
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert detail["message"] == "课程时间冲突"
+    assert [
+        (c["kind"], c["resource_id"], c["course_id"]) for c in detail["conflicts"]
+    ] == [("student", str(student.id), str(course["id"]))]
+
+    # 紧接着上一门课开始不算冲突
+    data["start_time"] = "2025-09-01 09:30"
+    response = client.post(f"{settings.API_V1_STR}/courses/", json=data)
+    assert response.status_code == 200
+
+
+def test_course_conflict_report(client: TestClient, db: Session) -> None:
+    student = create_random_student(db)
+    course = create_random_course(db, students=[student])
+    other_course = create_random_course(db, students=[student])
+    response = client.get(
+        f"{settings.API_V1_STR}/courses/conflicts",
+        params={"from": "2025-09-01 00:00", "to": "2025-09-02 00:00"},
+    )
+    assert response.status_code == 200
+    pair = sorted([str(course["id"]), str(other_course["id"])])
+    assert {
+        "kind": "student",
+        "resource_id": str(student.id),
+        "course_id": pair[0],
+        "other_course_id": pair[1],
+    } in response.json()
@@ -1,11 +1,16 @@
+import asyncio
+from typing import Any
 from unittest.mock import patch
 
+import httpx
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
 from app.core.security import verify_password
+from app.core.throttle import LoginLimiter, login_limiter
 from app.crud import create_user
+from app.main import app
 from app.models import UserCreate
 from app.tests.utils.user import user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
@@ -116,3 +121,81 @@ def test_reset_password_invalid_token(
     assert "detail" in response
     assert r.status_code == 400
     assert response["detail"] == "Invalid token"
+
+
+def test_login_throttled_after_repeated_failures(client: TestClient) -> None:
+    login_data = {"username": random_email(), "password": "incorrect"}
+    for _ in range(settings.LOGIN_ATTEMPTS_PER_USERNAME):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        assert r.status_code == 400
+    rejected = login_limiter.rejected["username"]
+    with patch("app.crud.verify_and_update_password_async") as verify:
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+    assert not verify.called
+    assert login_limiter.rejected["username"] == rejected + 1
+
+
+def test_login_throttle_only_counts_failures() -> None:
+    with (
+        patch("app.core.config.settings.LOGIN_THROTTLE_BACKEND", "memory"),
+        patch("app.core.config.settings.LOGIN_ATTEMPTS_PER_IP", 1),
+    ):
+        limiter = LoginLimiter()
+    username = random_email()
+    # Successful logins give their tokens back
+    for _ in range(settings.LOGIN_ATTEMPTS_PER_USERNAME + 1):
+        assert limiter.acquire(username, "10.0.0.1")
+        limiter.release(username, "10.0.0.1")
+
+    assert limiter.acquire(random_email(), "10.0.0.2")
+    assert not limiter.acquire(username, "10.0.0.2")
+    assert limiter.rejected["ip"] == 1
+    # The IP rejection gave the username token back
+    for i in range(settings.LOGIN_ATTEMPTS_PER_USERNAME):
+        assert limiter.acquire(username, f"10.0.1.{i}")
+    assert not limiter.acquire(username, "10.0.2.1")
+    assert limiter.rejected["username"] == 1
+
+
+def test_concurrent_failed_logins_throttled_before_hashing(db: Session) -> None:
+    email = random_email()
+    create_user(
+        session=db,
+        user_create=UserCreate(email=email, password=random_lower_string()),
+    )
+    with patch("app.core.config.settings.LOGIN_THROTTLE_BACKEND", "memory"):
+        limiter = LoginLimiter()
+    attempts = settings.LOGIN_ATTEMPTS_PER_USERNAME + 3
+
+    async def slow_verify(*_args: Any) -> tuple[bool, None]:
+        # 让所有请求在第一次哈希完成之前到达
+        await asyncio.sleep(0.2)
+        return False, None
+
+    async def login_burst() -> list[int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        f"{settings.API_V1_STR}/login/access-token",
+                        data={"username": email, "password": "incorrect"},
+                    )
+                    for _ in range(attempts)
+                )
+            )
+        return [r.status_code for r in responses]
+
+    with (
+        patch("app.api.routes.login.login_limiter", limiter),
+        patch(
+            "app.crud.verify_and_update_password_async", side_effect=slow_verify
+        ) as verify,
+    ):
+        statuses = asyncio.run(login_burst())
+    assert sorted(statuses) == [400] * settings.LOGIN_ATTEMPTS_PER_USERNAME + [429] * 3
+    assert verify.call_count == settings.LOGIN_ATTEMPTS_PER_USERNAME
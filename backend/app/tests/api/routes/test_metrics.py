@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_labeled_by_route_unique_id(client: TestClient) -> None:
+    requests = (
+        'http_requests_total{method="GET",route="utils-health_check",status="200"}'
+    )
+    before = _sample(client.get("/metrics").text, requests)
+    client.get(f"{settings.API_V1_STR}/utils/health-check/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+    assert _sample(text, requests) == before + 1
+    assert (
+        'http_request_duration_seconds_bucket{le="0.005",method="GET",route="utils-health_check"}'
+        in text
+    )
+    assert "http_response_size_bytes_count" in text
+    assert "http_requests_in_flight" in text
+    assert 'db_pool_checked_out{pool="primary"}' in text
+    assert "email_queue_depth" in text
+
+
+def test_metrics_requires_token(client: TestClient) -> None:
+    with patch("app.core.config.settings.METRICS_TOKEN", "scrape-secret"):
+        assert client.get("/metrics").status_code == 401
+        response = client.get(
+            "/metrics", headers={"Authorization": "Bearer wrong-secret"}
+        )
+        assert response.status_code == 401
+        response = client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+        )
+        assert response.status_code == 200
+
+
+def test_metrics_hidden_without_token_outside_local(client: TestClient) -> None:
+    with (
+        patch("app.core.config.settings.METRICS_TOKEN", None),
+        patch("app.core.config.settings.ENVIRONMENT", "production"),
+    ):
+        assert client.get("/metrics").status_code == 404
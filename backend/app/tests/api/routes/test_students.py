@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.tests.utils.course import create_random_course, create_random_student
+
+
+def test_list_students_cursor_pagination(client: TestClient, db: Session) -> None:
+    created = {str(create_random_student(db).id) for _ in range(5)}
+    seen: list[tuple[str, str]] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = client.get(f"{settings.API_V1_STR}/students/", params=params)
+        assert response.status_code == 200
+        seen.extend((s["name"], s["id"]) for s in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    assert seen == sorted(set(seen))
+    assert created <= {student_id for _, student_id in seen}
+
+
+def test_list_students_invalid_cursor(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/students/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_list_students_cursor_with_wrong_value_type(client: TestClient) -> None:
+    # 格式正确但 id 不是字符串的游标
+    response = client.get(
+        f"{settings.API_V1_STR}/students/",
+        params={"cursor": encode_cursor(["a", 2])},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_student_courses_pages_are_ordered(client: TestClient, db: Session) -> None:
+    student = create_random_student(db)
+    created = [
+        str(create_random_course(db, students=[student])["id"]) for _ in range(3)
+    ]
+    url = f"{settings.API_V1_STR}/students/{student.id}/courses/"
+    pages = [
+        client.get(url, params={"skip": skip, "limit": 1}).json() for skip in range(3)
+    ]
+    # 开始时间相同，按 id 排序
+    assert [page[0]["id"] for page in pages] == sorted(created)
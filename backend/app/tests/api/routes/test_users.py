@@ -5,6 +5,7 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app import crud
+from app.api.deps import user_cache
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
@@ -484,3 +485,23 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_current_user_cache_evicted_on_update(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    hits = user_cache.hits
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert user_cache.hits == hits + 1
+
+    full_name = random_lower_string()
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me",
+        headers=normal_user_token_headers,
+        json={"full_name": full_name},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.json()["full_name"] == full_name
@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.slow_queries import slow_query_log
+
+
+def test_slow_queries_recorded_and_explained(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    slow_query_log.clear()
+    with patch("app.core.config.settings.SLOW_QUERY_THRESHOLD_MS", 0.0001):
+        crud.get_schedules(db, limit=5)
+    url = f"{settings.API_V1_STR}/utils/slow-queries/"
+
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    entries = {e["caller"]: e for e in r.json()["data"]}
+    entry = entries["app.crud.get_schedules"]
+    assert "FROM schedule" in entry["sql"]
+    assert ": int" in entry["params_shape"]
+    assert entry["plan"] is None
+
+    r = client.post(f"{url}explain/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    plans = {e["caller"]: e["plan"] for e in r.json()["data"]}
+    assert "Execution Time" in plans["app.crud.get_schedules"]
+    slow_query_log.clear()
+
+
+def test_slow_queries_superuser_only(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/slow-queries/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
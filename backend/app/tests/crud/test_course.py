@@ -0,0 +1,68 @@
+import uuid
+from unittest.mock import patch
+
+from sqlmodel import Session, select
+
+from app import crud
+from app.models import CourseStudent, CourseUpdate, Student
+from app.tests.utils.course import create_random_course, create_random_student
+
+
+def test_get_student_courses_with_details(db: Session) -> None:
+    students = [create_random_student(db) for _ in range(3)]
+    course = create_random_course(db, students=students)
+    courses = crud.get_student_courses(db, students[0].id)
+    assert [c["id"] for c in courses] == [course["id"]]
+    detail = courses[0]
+    assert detail["teacher_name"]
+    assert detail["subject_name"]
+    assert {s["id"] for s in detail["students"]} == {s.id for s in students}
+
+
+def test_get_student_courses_invalid_status(db: Session) -> None:
+    student = create_random_student(db)
+    create_random_course(db, students=[student])
+    assert crud.get_student_courses(db, student.id, status="unknown") == []
+
+
+def test_create_course_returns_details(db: Session) -> None:
+    students = [create_random_student(db) for _ in range(2)]
+    course = create_random_course(db, students=students + students[:1])
+    assert course["teacher_name"]
+    assert course["subject_name"]
+    assert sorted(s["id"] for s in course["students"]) == sorted(s.id for s in students)
+    assert crud.get_course_detail(db, course["id"]) == course
+
+
+def test_get_missing_ids(db: Session) -> None:
+    student = create_random_student(db)
+    missing = [uuid.uuid4(), uuid.uuid4()]
+    ids = [missing[0], student.id, missing[1], missing[0]]
+    assert crud.get_missing_ids(db, Student, ids) == missing
+    assert crud.get_missing_ids(db, Student, []) == []
+
+
+def test_update_course_roster_keeps_unchanged_rows(db: Session) -> None:
+    students = [create_random_student(db) for _ in range(3)]
+    course = create_random_course(db, students=students[:2])
+    kept_row = db.exec(
+        select(CourseStudent).where(
+            CourseStudent.course_id == course["id"],
+            CourseStudent.student_id == students[1].id,
+        )
+    ).one()
+    course_in = CourseUpdate(student_ids=[students[1].id, students[2].id])
+    crud.update_course(db, course["id"], course_in)
+    rows = db.exec(
+        select(CourseStudent).where(CourseStudent.course_id == course["id"])
+    ).all()
+    assert {row.student_id for row in rows} == {students[1].id, students[2].id}
+    assert kept_row.id in {row.id for row in rows}
+
+
+def test_remove_course_students_noop_does_not_publish(db: Session) -> None:
+    course = create_random_course(db, students=[create_random_student(db)])
+    outsider = create_random_student(db)
+    with patch("app.crud.publish") as publish:
+        assert crud.remove_course_students(db, course["id"], [outsider.id]) == 0
+    publish.assert_not_called()
@@ -0,0 +1,117 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session
+
+from app.core.email_queue import EmailWorker, build_message, enqueue_email
+from app.models import EmailOutbox, EmailStatus
+from app.tests.utils.smtp import FakeSMTPServer
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture()
+def smtp_server() -> Generator[FakeSMTPServer, None, None]:
+    with FakeSMTPServer() as server:
+        with (
+            patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+            patch("app.core.config.settings.SMTP_PORT", server.port),
+            patch("app.core.config.settings.SMTP_TLS", False),
+            patch("app.core.config.settings.SMTP_SSL", False),
+            patch("app.core.config.settings.SMTP_USER", None),
+            patch("app.core.config.settings.EMAILS_FROM_EMAIL", "admin@example.com"),
+        ):
+            yield server
+
+
+def _enqueue(db: Session) -> EmailOutbox:
+    return enqueue_email(
+        db,
+        email_to=random_email(),
+        subject=random_lower_string(),
+        html_content="<p>hi</p>",
+    )
+
+
+def test_worker_sends_batch_over_one_connection(
+    db: Session, smtp_server: FakeSMTPServer
+) -> None:
+    emails = [_enqueue(db) for _ in range(3)]
+    worker = EmailWorker()
+    while worker.drain_once():
+        pass
+    worker.stop()
+
+    received = {m["To"] for m in smtp_server.messages}
+    for email in emails:
+        db.refresh(email)
+        assert email.status == EmailStatus.SENT
+        assert email.email_to in received
+    assert smtp_server.connections == 1
+
+
+def test_worker_retries_failed_email(db: Session, smtp_server: FakeSMTPServer) -> None:
+    email = _enqueue(db)
+    smtp_server.fail_next = 1
+    worker = EmailWorker()
+    worker.drain_once()
+    db.refresh(email)
+    assert email.status == EmailStatus.PENDING
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.now(timezone.utc)
+
+    email.next_attempt_at = datetime.now(timezone.utc)
+    db.add(email)
+    db.commit()
+    while worker.drain_once():
+        pass
+    worker.stop()
+    sent = db.get(EmailOutbox, email.id, populate_existing=True)
+    assert sent
+    assert sent.status == EmailStatus.SENT
+    assert sent.attempts == 2
+
+
+def test_worker_error_on_one_email_does_not_resend_others(
+    db: Session, smtp_server: FakeSMTPServer
+) -> None:
+    emails = [_enqueue(db) for _ in range(3)]
+    broken = emails[1]
+
+    def build(email: EmailOutbox) -> EmailMessage:
+        if email.id == broken.id:
+            raise ValueError("bad template")
+        return build_message(email)
+
+    worker = EmailWorker()
+    with patch("app.core.email_queue.build_message", build):
+        while worker.drain_once():
+            pass
+    worker.stop()
+
+    for email in emails:
+        db.refresh(email)
+    assert broken.status == EmailStatus.PENDING
+    assert broken.last_error == "bad template"
+    assert [e.status for e in emails if e is not broken] == [EmailStatus.SENT] * 2
+    assert len(smtp_server.messages) == 2
+
+
+@pytest.mark.usefixtures("smtp_server")
+def test_worker_reclaims_email_with_expired_lease(db: Session) -> None:
+    email = _enqueue(db)
+    # Claimed by a worker that died before recording the result
+    email.status = EmailStatus.SENDING
+    email.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.add(email)
+    db.commit()
+
+    worker = EmailWorker()
+    while worker.drain_once():
+        pass
+    worker.stop()
+    db.refresh(email)
+    assert email.status == EmailStatus.SENT
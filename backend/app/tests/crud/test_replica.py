@@ -0,0 +1,95 @@
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app import crud
+from app.api.deps import _get_user, user_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.core.replica import REPLICA_LAG_QUERY, RoutingSession
+from app.models import StudentCreate
+from app.tests.utils.utils import random_lower_string
+
+
+@pytest.fixture(scope="module")
+def replica() -> Generator[Engine, None, None]:
+    # 指向主库的只读连接，充当测试用的只读副本
+    standin = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        connect_args={"options": "-c default_transaction_read_only=on"},
+    )
+    yield standin
+    standin.dispose()
+
+
+def test_replica_standin_rejects_writes(replica: Engine) -> None:
+    with replica.connect() as conn:
+        assert conn.execute(REPLICA_LAG_QUERY).scalar_one() == 0
+        with pytest.raises(DBAPIError):
+            conn.execute(text("CREATE TEMP TABLE replica_write_check (id int)"))
+
+
+def test_routing_session_reads_own_writes_from_primary(replica: Engine) -> None:
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:  # type: ignore[no-untyped-def]
+        statements.append(statement)
+
+    event.listen(replica, "before_cursor_execute", record)
+    try:
+        with RoutingSession(engine, replica=replica) as session:
+            crud.get_students(session, limit=1)
+            assert len(statements) == 1
+
+            student = crud.create_student(
+                session, StudentCreate(name=random_lower_string(), genders=0)
+            )
+            assert crud.get_student(session, student.id)
+            crud.get_students(session, limit=1)
+            # 写入之后的读取全部留在主库
+            assert len(statements) == 1
+            crud.delete_student(session, student.id)
+    finally:
+        event.remove(replica, "before_cursor_execute", record)
+
+
+def test_reference_cache_loads_from_primary(replica: Engine) -> None:
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:  # type: ignore[no-untyped-def]
+        statements.append(statement)
+
+    event.listen(replica, "before_cursor_execute", record)
+    try:
+        with RoutingSession(engine, replica=replica) as session:
+            crud.subject_cache.invalidate()
+            crud.subject_cache.get_all(session)
+            assert statements == []
+            # 缓存加载不会把会话固定在主库
+            crud.get_students(session, limit=1)
+            assert len(statements) == 1
+    finally:
+        event.remove(replica, "before_cursor_execute", record)
+
+
+def test_user_cache_loads_from_primary(db: Session, replica: Engine) -> None:
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:  # type: ignore[no-untyped-def]
+        statements.append(statement)
+
+    user = crud.get_user_by_email(session=db, email=settings.FIRST_SUPERUSER)
+    assert user
+    event.listen(replica, "before_cursor_execute", record)
+    try:
+        with RoutingSession(engine, replica=replica) as session:
+            user_cache.evict()
+            assert _get_user(session, user.id)
+            # 缓存未命中时从主库读取，不会缓存副本上的旧数据
+            assert statements == []
+            assert user_cache.get(user.id)
+    finally:
+        event.remove(replica, "before_cursor_execute", record)
@@ -0,0 +1,30 @@
+from sqlmodel import Session
+
+from app import crud
+from app.core.querystats import count_queries
+from app.tests.utils.course import create_random_schedule
+
+
+def test_get_schedules_with_teacher_and_subject(db: Session) -> None:
+    schedule = create_random_schedule(db)
+    teacher = crud.get_teacher(db, schedule.teacher_id)
+    assert teacher
+    subject = crud.get_subject(db, teacher.subject_id)
+    assert subject
+    rows = {row["id"]: row for row in crud.get_schedules(db, limit=10000)}
+    assert rows[schedule.id]["teacher_name"] == teacher.name
+    assert rows[schedule.id]["subject_name"] == subject.name
+    teachers = {row["id"]: row for row in crud.get_teachers(db, limit=10000)}
+    assert teachers[teacher.id]["subject_name"] == subject.name
+
+
+def test_get_schedules_query_budget(db: Session) -> None:
+    for _ in range(3):
+        create_random_schedule(db)
+    # 学科名称来自缓存，行数增加不应增加查询次数
+    crud.get_schedules(db, limit=1)
+    with count_queries() as stats:
+        crud.get_schedules(db, limit=10000)
+        crud.get_teachers(db, limit=10000)
+    assert stats.count == 2
+    assert not stats.repeated(1)
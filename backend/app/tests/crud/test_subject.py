@@ -0,0 +1,59 @@
+import threading
+import time
+
+from sqlmodel import Session
+
+from app import crud
+from app.core import invalidation
+from app.models import SubjectCreate, SubjectUpdate, TeacherCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def test_subject_cache_invalidated_on_write(db: Session) -> None:
+    subject = crud.create_subject(db, SubjectCreate(name=random_lower_string()))
+    assert subject.id in {s["id"] for s in crud.get_subjects(db, limit=10000)}
+
+    teacher_in = TeacherCreate(
+        name=random_lower_string(),
+        remark=random_lower_string(),
+        spell_name=random_lower_string(),
+        genders=0,
+        subject_id=subject.id,
+    )
+    teacher = crud.create_teacher(db, teacher_in)
+    new_name = random_lower_string()
+    crud.update_subject(db, subject.id, SubjectUpdate(name=new_name))
+    teachers = {t["id"]: t for t in crud.get_teachers(db, limit=10000)}
+    assert teachers[teacher.id]["subject_name"] == new_name
+
+    crud.delete_teacher(db, teacher.id)
+    crud.delete_subject(db, subject.id)
+    assert subject.id not in {s["id"] for s in crud.get_subjects(db, limit=10000)}
+
+
+def test_subject_write_notifies_listener(db: Session) -> None:
+    received: list[str | None] = []
+    notified = threading.Event()
+
+    def on_change(subject_id: str | None) -> None:
+        received.append(subject_id)
+        # 一次来自本进程提交后的分发，一次来自监听连接
+        if len([r for r in received if r is not None]) >= 2:
+            notified.set()
+
+    invalidation.subscribe("subject", on_change)
+    listener = invalidation.InvalidationListener()
+    listener.start()
+    try:
+        # 监听连接建立后会以 None 通知一次
+        for _ in range(50):
+            if received:
+                break
+            time.sleep(0.1)
+        subject = crud.create_subject(db, SubjectCreate(name=random_lower_string()))
+        assert notified.wait(timeout=5)
+        assert received.count(str(subject.id)) == 2
+        crud.delete_subject(db, subject.id)
+    finally:
+        listener.stop()
+        invalidation.unsubscribe("subject", on_change)
@@ -1,8 +1,16 @@
+import asyncio
+
 from fastapi.encoders import jsonable_encoder
+from passlib.context import CryptContext
 from sqlmodel import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core.db import engine
+from app.core.security import (
+    password_hash_queue_depth,
+    pwd_context,
+    verify_password,
+)
 from app.models import User, UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
 
@@ -89,3 +97,43 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_authenticate_async(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    crud.create_user(session=db, user_create=UserCreate(email=email, password=password))
+
+    async def login(attempt: str) -> User | None:
+        # 并发登录各自使用独立的会话
+        with Session(engine) as session:
+            return await crud.authenticate_async(
+                session=session, email=email, password=attempt
+            )
+
+    async def login_many() -> list[User | None]:
+        return await asyncio.gather(
+            *(login(p) for p in [password, "wrong-password"] * 4)
+        )
+
+    users = asyncio.run(login_many())
+    assert [u is not None for u in users] == [True, False] * 4
+    assert password_hash_queue_depth() == 0
+
+
+def test_authenticate_upgrades_outdated_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(password)
+    user.hashed_password = old_hash
+    db.add(user)
+    db.commit()
+
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    assert authenticated_user.hashed_password != old_hash
+    assert not pwd_context.needs_update(authenticated_user.hashed_password)
+    assert crud.authenticate(session=db, email=email, password=password)
@@ -0,0 +1,48 @@
+from typing import Any
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import (
+    CourseCreate,
+    Schedule,
+    ScheduleCreate,
+    Student,
+    StudentCreate,
+    SubjectCreate,
+    TeacherCreate,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_schedule(db: Session) -> Schedule:
+    subject = crud.create_subject(db, SubjectCreate(name=random_lower_string()))
+    teacher_in = TeacherCreate(
+        name=random_lower_string(),
+        remark=random_lower_string(),
+        spell_name=random_lower_string(),
+        genders=1,
+        subject_id=subject.id,
+    )
+    teacher = crud.create_teacher(db, teacher_in)
+    schedule_in = ScheduleCreate(teacher_id=teacher.id, hours=10, fee=100.0)
+    return crud.create_schedule(db, schedule_in)
+
+
+def create_random_student(db: Session) -> Student:
+    student_in = StudentCreate(name=random_lower_string(), genders=0)
+    return crud.create_student(db, student_in)
+
+
+def create_random_course(
+    db: Session, students: list[Student] | None = None
+) -> dict[str, Any]:
+    schedule = create_random_schedule(db)
+    course_in = CourseCreate(
+        schedule_id=schedule.id,
+        start_time="2025-09-01 08:00",
+        end_time="2025-09-01 09:30",
+        address=random_lower_string(),
+        student_ids=[student.id for student in students or []],
+    )
+    return crud.create_course(db, course_in)
@@ -0,0 +1,72 @@
+import socketserver
+import threading
+from email import message_from_bytes
+from email.message import Message
+from typing import Any
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    server: "FakeSMTPServer"
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.server.connections += 1
+        self._reply("220 fake-smtp ready")
+        while line := self.rfile.readline():
+            command = line.decode().strip().split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self._reply("250 fake-smtp")
+            elif command == "MAIL":
+                self._reply("250 OK")
+            elif command == "RCPT":
+                if self.server.fail_next > 0:
+                    self.server.fail_next -= 1
+                    self._reply("451 Temporary failure")
+                else:
+                    self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data += chunk
+                self.server.messages.append(message_from_bytes(data))
+                self._reply("250 OK")
+            elif command in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Minimal in-process SMTP server for tests.
+
+    Received messages are collected in ``messages``; ``fail_next`` makes the
+    next N recipients fail with a temporary error.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages: list[Message] = []
+        self.connections = 0
+        self.fail_next = 0
+
+    @property
+    def port(self) -> int:
+        return int(self.server_address[1])
+
+    def __enter__(self) -> "FakeSMTPServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
@@ -4,13 +4,15 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
+from sqlmodel import Session
 
 from app.core import security
 from app.core.config import settings
+from app.core.db import engine
+from app.core.email_queue import enqueue_email
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,11 +24,27 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+# Compiled templates are cached by the environment; in the local environment
+# a template is recompiled when its file's mtime changes
+email_templates = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+    auto_reload=settings.ENVIRONMENT == "local",
+    cache_size=100,
+)
+
+
+def load_email_templates() -> None:
+    """
+    Compile every email template up front so the first emails render from memory.
+    """
+    for template_name in email_templates.list_templates(extensions=["html"]):
+        email_templates.get_template(template_name)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    html_content = email_templates.get_template(template_name).render(context)
     return html_content
 
 
@@ -36,23 +54,15 @@ def send_email(
     subject: str = "",
     html_content: str = "",
 ) -> None:
+    """
+    Queue an email; the background email worker sends it.
+    """
     assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    with Session(engine) as session:
+        enqueue_email(
+            session, email_to=email_to, subject=subject, html_content=html_content
+        )
+    logger.info(f"queued email to {email_to}")
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -0,0 +1,149 @@
+"""
+Measure /login/access-token throughput at several concurrency levels.
+
+Run against a started backend, e.g.:
+
+    python scripts/benchmark_login.py --url http://localhost:8000 \
+        --email admin@example.com --password changethis --concurrency 1 4 16 64
+
+The superuser given by --email creates --accounts benchmark users first (or
+reuses them), and each login loop signs in as a different one. Every login
+holds a token of its username's throttle bucket until its password check
+finishes (a successful login gives it back), so more than
+LOGIN_ATTEMPTS_PER_USERNAME concurrent logins to one account would be
+rejected with 429 before reaching the hash pool; spreading them over many
+accounts keeps every login in the measurement. All logins still come from
+one client IP, which holds one token per in-flight login as well: above
+LOGIN_ATTEMPTS_PER_IP concurrency, start the backend with
+LOGIN_THROTTLE_ENABLED=false or raise that limit. Throttled responses are
+reported separately from other errors.
+
+While logins run, a second client polls /utils/health-check/ so the report
+also shows whether unrelated endpoints stay responsive during the burst.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+ACCOUNT_PASSWORD = "benchmark-password"
+
+
+def _account_email(index: int) -> str:
+    return f"login-benchmark-{index}@example.com"
+
+
+async def create_accounts(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        r = await client.post(
+            "/api/v1/login/access-token",
+            data={"username": args.email, "password": args.password},
+        )
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        for index in range(args.accounts):
+            r = await client.post(
+                "/api/v1/users/",
+                headers=headers,
+                json={"email": _account_email(index), "password": ACCOUNT_PASSWORD},
+            )
+            # 400: the account exists from an earlier run
+            if r.status_code != 400:
+                r.raise_for_status()
+
+
+async def _login_loop(
+    client: httpx.AsyncClient,
+    data: dict[str, str],
+    deadline: float,
+    latencies: list[float],
+    statuses: Counter[int],
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        r = await client.post("/api/v1/login/access-token", data=data)
+        latencies.append(time.perf_counter() - start)
+        statuses[r.status_code] += 1
+
+
+async def _probe_loop(
+    client: httpx.AsyncClient, deadline: float, latencies: list[float]
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/api/v1/utils/health-check/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run_level(args: argparse.Namespace, concurrency: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=60
+    ) as client:
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        statuses: Counter[int] = Counter()
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            _probe_loop(client, deadline, probe_latencies),
+            *(
+                _login_loop(
+                    client,
+                    {
+                        "username": _account_email(i % args.accounts),
+                        "password": ACCOUNT_PASSWORD,
+                    },
+                    deadline,
+                    login_latencies,
+                    statuses,
+                )
+                for i in range(concurrency)
+            ),
+        )
+    throttled = statuses[429]
+    errors = sum(statuses.values()) - statuses[200] - throttled
+    print(
+        f"concurrency={concurrency:<4} "
+        f"logins/s={statuses[200] / args.duration:7.1f} "
+        f"p50={statistics.median(login_latencies or [0]) * 1000:7.1f}ms "
+        f"p95={_percentile(login_latencies, 0.95) * 1000:7.1f}ms "
+        f"throttled={throttled:<4} "
+        f"errors={errors:<4} "
+        f"health p95={_percentile(probe_latencies, 0.95) * 1000:6.1f}ms"
+    )
+    if throttled:
+        print("  warning: logins were throttled, see LOGIN_THROTTLE_ENABLED")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True, help="superuser email")
+    parser.add_argument("--password", required=True, help="superuser password")
+    parser.add_argument(
+        "--accounts", type=int, default=64, help="benchmark users to log in as"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per level"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+    asyncio.run(create_accounts(args))
+    for concurrency in args.concurrency:
+        asyncio.run(run_level(args, concurrency))
+
+
+if __name__ == "__main__":
+    main()
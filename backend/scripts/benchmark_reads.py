@@ -0,0 +1,107 @@
+"""
+Compare the sync and async CRUD paths for the course, student and teacher lists.
+
+Both paths are mounted on a throwaway app and driven in-process over ASGI, so
+the numbers reflect the database layer and threadpool, not the network. The
+sync and async engines use the same pool settings (DB_POOL_SIZE,
+DB_MAX_OVERFLOW), so the comparison is at equal pool size. Run it from the
+backend directory against a database with realistic data:
+
+    python scripts/benchmark_reads.py --duration 10 --concurrency 10 50 200
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from app import crud
+from app.api.deps import AsyncSessionDep, SessionDep
+from app.core.config import settings
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/{resource}")
+def sync_list(resource: str, session: SessionDep, limit: int = 50) -> Any:
+    if resource == "courses":
+        return crud.get_courses(session, limit=limit)
+    if resource == "students":
+        return crud.get_students(session, limit=limit)
+    return crud.get_teachers(session, limit=limit)
+
+
+@bench_app.get("/async/{resource}")
+async def async_list(resource: str, session: AsyncSessionDep, limit: int = 50) -> Any:
+    if resource == "courses":
+        return await crud.get_courses_async(session, limit=limit)
+    if resource == "students":
+        return await crud.get_students_async(session, limit=limit)
+    return await crud.get_teachers_async(session, limit=limit)
+
+
+async def _worker(
+    client: httpx.AsyncClient, url: str, deadline: float, latencies: list[float]
+) -> int:
+    errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        r = await client.get(url)
+        latencies.append(time.perf_counter() - start)
+        if r.status_code != 200:
+            errors += 1
+    return errors
+
+
+async def run(path: str, resource: str, concurrency: int, duration: float) -> None:
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        latencies: list[float] = []
+        deadline = time.perf_counter() + duration
+        errors = sum(
+            await asyncio.gather(
+                *(
+                    _worker(client, f"/{path}/{resource}", deadline, latencies)
+                    for _ in range(concurrency)
+                )
+            )
+        )
+    latencies.sort()
+    p99 = (
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        if latencies
+        else 0.0
+    )
+    print(
+        f"{path:<5} {resource:<8} concurrency={concurrency:<4} "
+        f"req/s={len(latencies) / duration:8.1f} p99={p99 * 1000:8.1f}ms errors={errors}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument(
+        "--resources", nargs="+", default=["courses", "students", "teachers"]
+    )
+    args = parser.parse_args()
+    print(f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW}")
+    asyncio.run(run_all(args))
+
+
+async def run_all(args: argparse.Namespace) -> None:
+    # One event loop for every run: async pool connections are bound to it
+    for resource in args.resources:
+        for concurrency in args.concurrency:
+            for path in ("sync", "async"):
+                await run(path, resource, concurrency, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -95,8 +95,8 @@ export default function EditCourse({
   useEffect(() => {
     if (isOpen && course) {
       setValue("schedule_id", course.schedule_id);
-      setValue("start_time", course.start_time.replace(" ", "T"));
-      setValue("end_time", course.end_time.replace(" ", "T"));
+      setValue("start_time", course.start_time.replace(" ", "T").slice(0, 16));
+      setValue("end_time", course.end_time.replace(" ", "T").slice(0, 16));
       setValue("address", course.address);
       setValue("status", course.status);
       setValue("remark", course.remark || "");